@@ -0,0 +1,321 @@
+import sys
+import json
+import time
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from scanner_engine import (PropGuardConfig, MT5Source, ReplaySource, score_bar_stage, score_tick_stage,
+                            static_score, final_score, SymbolUniverse)
+
+# ==========================================
+# 1️⃣ HISTORY
+# Bars of many symbols as [symbol, bar] arrays. Rows are left-aligned (bar 0 is each
+# symbol's oldest) and padded with NaN at the end, so the time recursions below can
+# step all symbols at once; `time` keeps each bar's real timestamp for slicing.
+# ==========================================
+class History:
+    def __init__(self, symbols, rates, points, timeframe):
+        self.symbols = list(symbols)
+        self.timeframe = timeframe
+        self.lengths = np.array([len(r) for r in rates])
+        shape = (len(rates), int(self.lengths.max()) if len(rates) else 0)
+        self.time = np.zeros(shape, dtype=np.int64)
+        self.open, self.high, self.low, self.close = (np.full(shape, np.nan) for _ in range(4))
+        self.spread = np.zeros(shape)
+        for i, r in enumerate(rates):
+            n = len(r)
+            self.time[i, :n] = r['time']
+            self.open[i, :n], self.high[i, :n], self.low[i, :n], self.close[i, :n] = \
+                r['open'], r['high'], r['low'], r['close']
+            self.spread[i, :n] = r['spread']
+        self.point = np.asarray(points, dtype=float)
+
+    @classmethod
+    def from_arrays(cls, symbols, timeframe, time, high, low, close, spread, point, lengths, open=None):
+        hist = cls.__new__(cls)
+        hist.symbols, hist.timeframe = list(symbols), timeframe
+        hist.time, hist.high, hist.low, hist.close, hist.spread = time, high, low, close, spread
+        hist.open = close if open is None else open
+        hist.point, hist.lengths = point, lengths
+        return hist
+
+    @property
+    def valid(self):
+        return np.arange(self.close.shape[1]) < self.lengths[:, None]
+
+def load_history(source, symbols, timeframe=PropGuardConfig.TIMEFRAME, bars=20000):
+    # Pulls up to `bars` bars per symbol from any MarketDataSource; symbols that have
+    # no data or no contract spec are skipped.
+    if not source.initialize(): raise RuntimeError(f"{type(source).__name__} initialize() failed")
+    try:
+        names, rates, points = [], [], []
+        for s in symbols:
+            r = source.copy_rates_from_pos(s, timeframe, 0, bars)
+            info = source.symbol_info(s)
+            if r is None or not len(r) or not info: continue
+            names.append(s)
+            rates.append(r[:-1])   # drop the forming bar
+            points.append(info.point)
+        return History(names, rates, points, timeframe)
+    finally:
+        source.shutdown()
+
+def replay_history(path, symbols=None, bars=20000):
+    # Every recorded bar of a record_replay() directory. Read straight from the file:
+    # ReplaySource's clock starts at the first tick and would hide the bars after it.
+    source = ReplaySource(path, speed=None)
+    names, rates, points = [], [], []
+    for s in symbols or list(source.specs):
+        r = source.rates.get(s)
+        if r is None or len(r) < 2: continue
+        names.append(s)
+        rates.append(r[:-1][-bars:])   # drop the bar that was forming when it was recorded
+        points.append(source.specs[s]['point'])
+    return History(names, rates, points, source.timeframe)
+
+def synthetic_history(n_symbols, bars, seed=7, timeframe=PropGuardConfig.TIMEFRAME):
+    # Offline data: the benchmark's GBM market, history only
+    from bench_scanner import SyntheticMarket
+    market = SyntheticMarket(n_symbols, timeframe=timeframe, history=bars, seed=seed)
+    rates = [market.copy_rates_from_pos(s, market.timeframe, 1, bars) for s in market.names]
+    return History(market.names, rates, market.point, timeframe)
+
+# ==========================================
+# 2️⃣ VECTORIZED INDICATORS
+# The streaming IndicatorEngine's recursions, run over whole histories: one Python
+# loop over bars, each step a handful of numpy ops across every symbol (and every
+# same-shaped smoother stacked together). Results match IndicatorEngine bar for bar.
+# ==========================================
+def ewm_rows(x, alpha, adjust, min_periods):
+    # EWM.update applied along axis 1; alpha / adjust / min_periods may be per row
+    rows, n = x.shape
+    alpha = np.broadcast_to(np.asarray(alpha, dtype=float), (rows,))
+    adjust = np.broadcast_to(np.asarray(adjust, dtype=bool), (rows,))
+    min_periods = np.maximum(np.broadcast_to(np.asarray(min_periods), (rows,)), 1)
+    decay, new_wt = 1.0 - alpha, np.where(adjust, 1.0, alpha)
+    avg, old_wt, nobs = np.full(rows, np.nan), np.ones(rows), np.zeros(rows, dtype=np.int64)
+    out = np.full((rows, n), np.nan)
+    with np.errstate(invalid='ignore'):
+        for t in range(n):
+            xt = x[:, t]
+            obs = xt == xt
+            nobs += obs
+            has = avg == avg
+            old_wt = np.where(has, old_wt * decay, old_wt)
+            upd = has & obs
+            blended = (old_wt * avg + new_wt * xt) / (old_wt + new_wt)
+            avg = np.where(upd & (avg != xt), blended, avg)
+            old_wt = np.where(upd, np.where(adjust, old_wt + new_wt, 1.0), old_wt)
+            avg = np.where(~has & obs, xt, avg)
+            out[:, t] = np.where(nobs >= min_periods, avg, np.nan)
+    return out
+
+INDICATOR_PARAMS = ("EMA_PERIOD", "ATR_PERIOD", "RSI_PERIOD", "ADX_PERIOD", "LOOKBACK")
+
+def indicators_for(hist, params=None):
+    # indicator_arrays with any of INDICATOR_PARAMS overridden (config values otherwise)
+    p = {k: getattr(PropGuardConfig, k) for k in INDICATOR_PARAMS}
+    p.update({k: int(v) for k, v in (params or {}).items() if k in p})
+    return indicator_arrays(hist.high, hist.low, hist.close, p["EMA_PERIOD"], p["ATR_PERIOD"],
+                            p["RSI_PERIOD"], p["ADX_PERIOD"], p["LOOKBACK"])
+
+def rolling_max(x, length):
+    out = np.full(x.shape, np.nan)
+    if x.shape[1] >= length: out[:, length - 1:] = sliding_window_view(x, length, axis=1).max(axis=-1)
+    return out
+
+def indicator_arrays(high, low, close, ema_period=PropGuardConfig.EMA_PERIOD, atr_period=PropGuardConfig.ATR_PERIOD,
+                     rsi_period=PropGuardConfig.RSI_PERIOD, adx_period=PropGuardConfig.ADX_PERIOD,
+                     lookback=PropGuardConfig.LOOKBACK):
+    S, T = close.shape
+    with np.errstate(invalid='ignore'):
+        ph, pl, pc = (np.concatenate([np.full((S, 1), np.nan), a[:, :-1]], axis=1) for a in (high, low, close))
+        first = np.zeros((S, T), dtype=bool)
+        first[:, 0] = True
+        tr = np.maximum(np.maximum(high - low, np.abs(high - pc)), np.abs(pc - low))
+        diff = close - pc
+        up, dn = high - ph, pl - low
+        dm_p = np.where(first, np.nan, np.where((up > dn) & (up > 0), up, 0.0))
+        dm_n = np.where(first, np.nan, np.where((dn > up) & (dn > 0), dn, 0.0))
+
+        # pandas_ta EMA: SMA of the first ema_period closes, then a plain EMA of the rest
+        seeded = np.where(np.arange(T) >= ema_period, close, np.nan)
+        if T >= ema_period: seeded[:, ema_period - 1] = close[:, :ema_period].mean(axis=1)
+
+        stack = np.concatenate([tr, np.maximum(diff, 0.0), np.minimum(diff, 0.0), tr, dm_p, dm_n, seeded])
+        periods = np.repeat([atr_period, rsi_period, rsi_period, adx_period, adx_period, adx_period, ema_period], S)
+        is_rma = np.arange(7 * S) < 6 * S
+        smooth = ewm_rows(stack, np.where(is_rma, 1.0 / periods, 2.0 / (periods + 1)), is_rma,
+                          np.where(is_rma, periods, 0))
+        atr, up_avg, dn_avg, adx_atr, dmp_avg, dmn_avg, ema = smooth.reshape(7, S, T)
+
+        rsi_den = up_avg + np.abs(dn_avg)
+        rsi = np.where(rsi_den != 0, 100.0 * up_avg / rsi_den, np.nan)
+        k = np.where(adx_atr != 0, 100.0 / adx_atr, np.nan)
+        dmp, dmn = k * dmp_avg, k * dmn_avg
+        dx = np.where(dmp + dmn != 0, 100.0 * np.abs(dmp - dmn) / (dmp + dmn), np.nan)
+        adx = ewm_rows(dx, 1.0 / adx_period, True, adx_period)
+
+    return {"close": close, "ema": ema, "atr": atr, "rsi": rsi, "adx": adx,
+            "dcu": rolling_max(high, lookback), "dcl": -rolling_max(-low, lookback)}
+
+# ==========================================
+# 3️⃣ SIGNALS AND OUTCOMES
+# Every closed bar is scored as the live scanner would have scored it at that bar's
+# close (bid = close, ask = close + the bar's spread) and then traded: entry at that
+# price, ATR stop and R:R target, exits checked on the following bars' ranges.
+# ==========================================
+OUTCOME_OPEN, OUTCOME_TP, OUTCOME_SL, OUTCOME_TIMEOUT = 0, 1, -1, 2
+
+def score_history(hist, ind, rr_ratio=2.0, weights=None, atr_multiplier=None):
+    bid = hist.close
+    ask = hist.close + hist.spread * hist.point[:, None]
+    res = score_bar_stage(ind['close'], ind['ema'], ind['atr'], ind['rsi'], ind['adx'], weights)
+    res.update(score_tick_stage(res['bias'], res['static'], ind['atr'], ind['dcu'], ind['dcl'], bid, ask,
+                                hist.point[:, None], rr_ratio, weights, atr_multiplier))
+    res['score'] = np.where(hist.valid, res['score'], np.nan)
+    return res
+
+def reweight(res, weights, valid):
+    # The score for other component weights; bias, entry and exits don't depend on them
+    static = static_score(res['trend'], res['mom'], res['vol'], weights)
+    return np.where(valid, final_score(static, res['struct'], res['liq'], weights), np.nan)
+
+def simulate_exits(hist, bias, entry, sl, tp, horizon=100):
+    # Returns (outcome, R multiple, bars held) per signal bar. A bar touching both levels
+    # counts as a stop. Longs exit on the bid, shorts (and NEUTRAL, priced like one) on
+    # the ask. Each step only looks at the trades still open, which shrink fast.
+    S, T = entry.shape
+    outcome = np.zeros((S, T), dtype=np.int8)
+    r_mult = np.full((S, T), np.nan)
+    held = np.zeros((S, T), dtype=np.int32)
+    with np.errstate(invalid='ignore'):
+        risk = np.abs(entry - sl)
+        rows, cols = np.nonzero(np.isfinite(entry) & np.isfinite(sl) & (risk > 0))
+    long, e, stop_px, take_px, risk = (bias == 1)[rows, cols], entry[rows, cols], sl[rows, cols], \
+        tp[rows, cols], risk[rows, cols]
+    spread = hist.spread * hist.point[:, None]
+    for k in range(1, horizon + 1):
+        # Trades running past the end of a symbol's data stay OUTCOME_OPEN
+        keep = cols + k < hist.lengths[rows]
+        rows, cols, long, e, stop_px, take_px, risk = (a[keep] for a in (rows, cols, long, e, stop_px, take_px, risk))
+        if not len(rows): break
+        at = cols + k
+        hi, lo, cl, sp = hist.high[rows, at], hist.low[rows, at], hist.close[rows, at], spread[rows, at]
+        stop = np.where(long, lo <= stop_px, hi + sp >= stop_px)
+        take = ~stop & np.where(long, hi >= take_px, lo + sp <= take_px)
+        outcome[rows[stop], cols[stop]] = OUTCOME_SL
+        r_mult[rows[stop], cols[stop]] = -1.0
+        outcome[rows[take], cols[take]] = OUTCOME_TP
+        r_mult[rows[take], cols[take]] = (np.abs(take_px - e) / risk)[take]
+        done = stop | take
+        held[rows[done], cols[done]] = k
+        if k == horizon:
+            left = ~done
+            exit_px = np.where(long, cl, cl + sp)
+            r = np.where(long, exit_px - e, e - exit_px) / risk
+            outcome[rows[left], cols[left]] = OUTCOME_TIMEOUT
+            r_mult[rows[left], cols[left]] = r[left]
+            held[rows[left], cols[left]] = k
+            break
+        rows, cols, long, e, stop_px, take_px, risk = (a[~done] for a in (rows, cols, long, e, stop_px, take_px, risk))
+    return outcome, r_mult, held
+
+DEFAULT_BUCKETS = (0, 40, 50, 60, 70, 80, 85, 90, 100.1)
+
+def trade_stats(outcome, r_mult, mask):
+    # Trades, hit rate and expectancy (mean R) of the closed trades selected by mask
+    m = mask & (outcome != OUTCOME_OPEN)
+    n = int(m.sum())
+    if not n: return {"trades": 0, "hit_rate": None, "expectancy_r": None}
+    return {"trades": n, "hit_rate": float((outcome[m] == OUTCOME_TP).sum() / n), "expectancy_r": float(r_mult[m].mean())}
+
+def bucket_report(score, outcome, r_mult, edges=DEFAULT_BUCKETS):
+    # Hit rate and expectancy (mean R per trade) for each score range; trades still
+    # open at the end of the data are left out
+    closed = (outcome != OUTCOME_OPEN) & np.isfinite(score)
+    s, o, r = score[closed], outcome[closed], r_mult[closed]
+    report = []
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        m = (s >= lo) & (s < hi)
+        n = int(m.sum())
+        wins = int((o[m] == OUTCOME_TP).sum())
+        report.append({"band": f"{lo:g}-{min(hi, 100):g}", "trades": n, "wins": wins,
+                       "losses": int((o[m] == OUTCOME_SL).sum()), "timeouts": int((o[m] == OUTCOME_TIMEOUT).sum()),
+                       "hit_rate": wins / n if n else None, "expectancy_r": float(r[m].mean()) if n else None,
+                       "total_r": float(r[m].sum())})
+    return report
+
+def run_backtest(hist, rr_ratio=2.0, horizon=100, edges=DEFAULT_BUCKETS):
+    timings = {}
+    t = time.perf_counter()
+    ind = indicator_arrays(hist.high, hist.low, hist.close)
+    timings["indicators_s"] = time.perf_counter() - t
+    t = time.perf_counter()
+    res = score_history(hist, ind, rr_ratio)
+    timings["scoring_s"] = time.perf_counter() - t
+    t = time.perf_counter()
+    outcome, r_mult, held = simulate_exits(hist, res['bias'], res['entry'], res['sl'], res['tp'], horizon)
+    timings["exits_s"] = time.perf_counter() - t
+    res.update(outcome=outcome, r=r_mult, held=held)
+    return res, bucket_report(res['score'], outcome, r_mult, edges), timings
+
+# ==========================================
+# 4️⃣ CLI
+# ==========================================
+def print_report(report):
+    print(f"{'Score':<9}{'Trades':>8}{'Hit %':>8}{'E[R]':>8}{'Total R':>10}{'TP':>7}{'SL':>7}{'Time':>6}")
+    for b in report:
+        hit = f"{100 * b['hit_rate']:.1f}" if b['trades'] else "-"
+        exp = f"{b['expectancy_r']:+.3f}" if b['trades'] else "-"
+        print(f"{b['band']:<9}{b['trades']:>8}{hit:>8}{exp:>8}{b['total_r']:>10.1f}"
+              f"{b['wins']:>7}{b['losses']:>7}{b['timeouts']:>6}")
+
+def history_from_args(args):
+    cfg = PropGuardConfig
+    if args.synthetic: return synthetic_history(args.synthetic, args.bars, timeframe=args.timeframe)
+    if args.replay: return replay_history(args.replay, args.symbols.split(",") if args.symbols else None, args.bars)
+    source = MT5Source()
+    symbols = args.symbols.split(",") if args.symbols else [s for syms in cfg.ASSETS.values() for s in syms]
+    if source.initialize():
+        # Map configured names onto the broker's spelling before downloading
+        universe = SymbolUniverse(source.symbols_get)
+        symbols = [n for n in (universe.resolve(s) for s in symbols) if n]
+    return load_history(source, symbols, args.timeframe, args.bars)
+
+def add_history_args(p):
+    p.add_argument("--symbols", help="comma separated list (default: every symbol in PropGuardConfig.ASSETS)")
+    p.add_argument("--timeframe", default=PropGuardConfig.TIMEFRAME, choices=sorted(PropGuardConfig.TIMEFRAME_SECONDS))
+    p.add_argument("--bars", type=int, default=20000, help="history per symbol")
+    p.add_argument("--replay", metavar="DIR", help="use the bars of a record_replay() directory")
+    p.add_argument("--synthetic", type=int, default=0, metavar="N", help="N synthetic GBM symbols, no terminal")
+
+def main(argv=None):
+    import argparse
+    p = argparse.ArgumentParser(description="Backtest of the scanner's score: every bar scored and traded.")
+    add_history_args(p)
+    p.add_argument("--rr", type=float, default=2.0, help="reward to risk ratio")
+    p.add_argument("--horizon", type=int, default=100, help="bars before an open trade is closed at market")
+    p.add_argument("--json", metavar="FILE", help="also write the report as JSON")
+    args = p.parse_args(argv)
+
+    t = time.perf_counter()
+    hist = history_from_args(args)
+    load_s = time.perf_counter() - t
+    if not hist.symbols:
+        print("No history loaded", file=sys.stderr)
+        return 1
+    res, report, timings = run_backtest(hist, args.rr, args.horizon)
+    print(f"{len(hist.symbols)} symbols, {int(hist.lengths.sum())} bars ({args.timeframe}), R:R 1:{args.rr}, "
+          f"horizon {args.horizon} bars | load {load_s:.2f}s  " +
+          "  ".join(f"{k[:-2]} {v:.2f}s" for k, v in timings.items()))
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"symbols": hist.symbols, "timeframe": args.timeframe, "rr": args.rr, "horizon": args.horizon,
+                       "bars": int(hist.lengths.sum()), "timings": timings, "buckets": report}, f, indent=1)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
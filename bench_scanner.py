@@ -0,0 +1,282 @@
+import sys
+import json
+import time
+import platform
+import types
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import numpy as np
+
+import scanner_engine
+from scanner_engine import PropGuardConfig, ScanEngine, MT5Source
+
+# ==========================================
+# 1️⃣ SYNTHETIC TERMINAL
+# A MetaTrader5 stand-in installed under sys.modules["MetaTrader5"], so the engine
+# runs its real MT5Source code path without a terminal. Prices follow a geometric
+# Brownian motion per symbol on a virtual clock the benchmark steps forward.
+# ==========================================
+RATES_DTYPE = np.dtype([('time', '<i8'), ('open', '<f8'), ('high', '<f8'), ('low', '<f8'), ('close', '<f8'),
+                        ('tick_volume', '<u8'), ('spread', '<i4'), ('real_volume', '<u8')])
+TIMEFRAMES = {name: i for i, name in enumerate(PropGuardConfig.TIMEFRAME_SECONDS)}
+YEAR_SECONDS = 252 * 86400
+CATEGORY_PATHS = {"FOREX": "Forex\\Majors", "INDICES": "Indices\\Cash", "METALS": "Metals\\Spot",
+                  "ENERGY": "Energies\\Spot", "CRYPTO": "Crypto\\Spot"}
+
+class SyntheticMarket:
+    # activity: chance a symbol ticks in a given step. spread_bps / vol_range bound the
+    # per-symbol spread and annualized volatility, drawn once from the seed.
+    def __init__(self, n_symbols, timeframe=PropGuardConfig.TIMEFRAME, history=PropGuardConfig.HISTORY_BARS,
+                 capacity=None, seed=7, activity=0.6, spread_bps=(0.5, 3.0), vol_range=(0.05, 0.6)):
+        rng = self.rng = np.random.default_rng(seed)
+        self.bar_seconds = PropGuardConfig.TIMEFRAME_SECONDS[timeframe]
+        self.timeframe = TIMEFRAMES[timeframe]
+        self.activity = activity
+        self.names, self.paths = self.make_names(n_symbols)
+        self.index = {s: i for i, s in enumerate(self.names)}
+        n = len(self.names)
+
+        price = np.exp(rng.uniform(np.log(0.5), np.log(50000.0), n))
+        self.digits = np.clip(5 - np.floor(np.log10(price)).astype(int), 0, 5)
+        self.point = 10.0 ** -self.digits
+        self.sigma = rng.uniform(*vol_range, n)                    # annualized
+        self.spread_pts = np.maximum(np.round(price * rng.uniform(*spread_bps, n) / 1e4 / self.point), 1)
+        self.quoted_in_usd = rng.random(n) < 0.8
+
+        # History: `history` closed bars plus the forming one, on a shared bar grid
+        self.capacity = capacity or history + 64
+        self.now = (int(time.time()) // self.bar_seconds) * self.bar_seconds
+        self.times = np.zeros(self.capacity, dtype=np.int64)
+        self.ohlc = np.zeros((4, n, self.capacity))
+        self.volume = np.zeros((n, self.capacity), dtype=np.uint64)
+        bar_sigma = self.sigma * np.sqrt(self.bar_seconds / YEAR_SECONDS)
+        steps = rng.standard_normal((n, history)) * bar_sigma[:, None]
+        closes = price[:, None] * np.exp(np.cumsum(steps, axis=1) - steps.sum(axis=1)[:, None])
+        opens = np.concatenate([closes[:, :1] / np.exp(steps[:, :1]), closes[:, :-1]], axis=1)
+        wick = np.abs(rng.standard_normal((2, n, history))) * bar_sigma[:, None] * 0.5
+        o, h, l, c = self.ohlc
+        o[:, :history], c[:, :history] = opens, closes
+        h[:, :history] = np.maximum(opens, closes) * (1 + wick[0])
+        l[:, :history] = np.minimum(opens, closes) * (1 - wick[1])
+        self.volume[:, :history] = rng.integers(100, 5000, (n, history))
+        self.times[:history] = self.now - np.arange(history, 0, -1) * self.bar_seconds
+        self.filled = history
+        self.open_bar(closes[:, -1])
+
+        self.bid = closes[:, -1].copy()
+        self.ask = self.bid + self.spread_pts * self.point
+        self.tick_time = np.full(n, self.now, dtype=np.int64) * 1000
+        self.balance = 100000.0
+        self.calls = 0
+
+    @staticmethod
+    def make_names(n):
+        # The configured ASSETS first (so suffix-free names resolve), then numbered fillers
+        names, paths = [], []
+        for cat, syms in PropGuardConfig.ASSETS.items():
+            for s in syms:
+                names.append(s)
+                paths.append(f"{CATEGORY_PATHS.get(cat, 'Other')}\\{s}")
+        for i in range(max(n - len(names), 0)):
+            names.append(f"SYN{i:05d}")
+            paths.append(f"Stocks\\Synthetic\\SYN{i:05d}")
+        return names[:n], paths[:n]
+
+    def open_bar(self, price):
+        if self.filled == self.capacity: raise RuntimeError("SyntheticMarket capacity exhausted")
+        k = self.filled
+        self.times[k] = (self.now // self.bar_seconds) * self.bar_seconds
+        for a in self.ohlc: a[:, k] = price
+        self.volume[:, k] = 0
+        self.filled += 1
+
+    def step(self, seconds):
+        # Moves the clock and lets a random subset of symbols tick once
+        self.now += seconds
+        if self.now // self.bar_seconds * self.bar_seconds > self.times[self.filled - 1]:
+            self.open_bar(self.bid)
+        n = len(self.names)
+        live = np.flatnonzero(self.rng.random(n) < self.activity)
+        dt = seconds / YEAR_SECONDS
+        z = self.rng.standard_normal(len(live))
+        sig = self.sigma[live]
+        bid = self.bid[live] * np.exp(sig * np.sqrt(dt) * z - 0.5 * sig * sig * dt)
+        bid = np.round(bid / self.point[live]) * self.point[live]
+        widen = self.rng.uniform(0.8, 1.5, len(live))
+        self.bid[live] = bid
+        self.ask[live] = bid + np.round(self.spread_pts[live] * widen) * self.point[live]
+        self.tick_time[live] = self.now * 1000 + self.rng.integers(0, 1000, len(live))
+        k = self.filled - 1
+        o, h, l, c = self.ohlc
+        h[live, k] = np.maximum(h[live, k], bid)
+        l[live, k] = np.minimum(l[live, k], bid)
+        c[live, k] = bid
+        self.volume[live, k] += 1
+
+    # --- MetaTrader5 API ---
+    def initialize(self, *args, **kwargs): return True
+    def shutdown(self): pass
+
+    def copy_rates_from_pos(self, symbol, timeframe, start_pos, count):
+        self.calls += 1
+        i = self.index.get(symbol)
+        if i is None or timeframe != self.timeframe: return None
+        end = self.filled - start_pos
+        start = max(end - count, 0)
+        if end <= 0: return None
+        out = np.zeros(end - start, dtype=RATES_DTYPE)
+        out['time'] = self.times[start:end]
+        for f, a in zip(("open", "high", "low", "close"), self.ohlc): out[f] = a[i, start:end]
+        out['tick_volume'] = self.volume[i, start:end]
+        out['spread'] = self.spread_pts[i]
+        return out
+
+    def symbol_info_tick(self, symbol):
+        self.calls += 1
+        i = self.index.get(symbol)
+        if i is None: return None
+        t = int(self.tick_time[i])
+        return SimpleNamespace(time=t // 1000, time_msc=t, bid=float(self.bid[i]), ask=float(self.ask[i]),
+                               last=0.0, volume=0, flags=6, volume_real=0.0)
+
+    def symbol_info(self, symbol):
+        self.calls += 1
+        i = self.index.get(symbol)
+        if i is None: return None
+        point = float(self.point[i])
+        return SimpleNamespace(
+            name=symbol, path=self.paths[i], visible=True, select=True, digits=int(self.digits[i]),
+            point=point, trade_tick_size=point, trade_tick_value=1.0 if self.quoted_in_usd[i] else 1.08,
+            volume_step=0.01, volume_min=0.01, volume_max=100.0, trade_mode=4, trade_contract_size=100000.0,
+            currency_profit="USD" if self.quoted_in_usd[i] else "EUR", bid=float(self.bid[i]), ask=float(self.ask[i]))
+
+    def symbols_get(self, group=None):
+        self.calls += 1
+        return tuple(self.symbol_info(s) for s in self.names)
+
+    def symbol_select(self, symbol, enable=True): return symbol in self.index
+
+    def account_info(self):
+        self.calls += 1
+        return SimpleNamespace(balance=self.balance, equity=self.balance, currency="USD", login=0, leverage=100)
+
+    def module(self):
+        mod = types.ModuleType("MetaTrader5")
+        for name in ("initialize", "shutdown", "copy_rates_from_pos", "symbol_info_tick", "symbol_info",
+                     "symbols_get", "symbol_select", "account_info"):
+            setattr(mod, name, getattr(self, name))
+        for name, value in TIMEFRAMES.items(): setattr(mod, f"TIMEFRAME_{name}", value)
+        return mod
+
+def install(market):
+    sys.modules["MetaTrader5"] = market.module()
+
+class BenchSource(MT5Source):
+    # The live adapter, but on the market's virtual clock: every cycle steps it by `step`
+    # seconds and the scheduler's sleeps return at once.
+    def __init__(self, market, step):
+        super().__init__()
+        self.market = market
+        self.step = step
+
+    def advance(self): self.market.step(self.step)
+    def time(self): return float(self.market.now)
+    def sleep(self, seconds): pass
+
+# ==========================================
+# 2️⃣ BENCHMARK
+# ==========================================
+def run_case(n_symbols, cycles, step=60, seed=7, workers=None):
+    cfg = PropGuardConfig
+    if workers: cfg.FETCH_WORKERS = workers
+    market = SyntheticMarket(n_symbols, seed=seed, capacity=cfg.HISTORY_BARS + 4 + cycles * step // 3600)
+    install(market)
+    engine = ScanEngine(BenchSource(market, step))
+    engine.set_config(list(market.names), 0.5, 2.0)
+
+    # marks[0] ends the cold cycle (full history load + indicator warm-up); the
+    # reset at marks[1] keeps its samples out of the steady-state percentiles
+    marks = []
+    def consume(snapshot):
+        marks.append((time.perf_counter(), market.calls, len(snapshot['rows'])))
+        if len(marks) == 2: engine.latency.reset()
+        if len(marks) > cycles + 1: engine.stop()
+
+    engine.consumers.append(consume)
+    start = time.perf_counter()
+    if not engine.run(): raise RuntimeError("engine failed to start")
+    (t_first, calls_first, _), (t_last, calls_last, rows) = marks[1], marks[-1]
+    warm = t_last - t_first
+    stages = engine.latency.snapshot()["stages"]
+    return {
+        "symbols": n_symbols,
+        "cycles": cycles,
+        "cold_start_s": marks[0][0] - start,
+        "cycles_per_s": cycles / warm if warm else None,
+        "symbols_per_s": cycles * n_symbols / warm if warm else None,
+        "terminal_calls_per_cycle": (calls_last - calls_first) / cycles,
+        "ranked_rows": rows,
+        "filtered": len(engine.filtered),
+        "stages": {name: s for name, s in stages.items() if s["count"]},
+    }
+
+DEFAULT_CYCLES = {10: 500, 100: 300, 1000: 100, 10000: 20}
+
+def compare(results, baseline, tolerance):
+    # Prints the change against a previous run; returns the regressions beyond tolerance %
+    regressions = []
+    for key, cur in results["cases"].items():
+        old = baseline.get("cases", {}).get(key)
+        if not old: continue
+        checks = [("cycle p50", cur["stages"].get("cycle", {}).get("p50_ms"), old["stages"].get("cycle", {}).get("p50_ms"), 1),
+                  ("cycle p95", cur["stages"].get("cycle", {}).get("p95_ms"), old["stages"].get("cycle", {}).get("p95_ms"), 1),
+                  ("cold start", cur["cold_start_s"], old["cold_start_s"], 1),
+                  ("throughput", cur["cycles_per_s"], old["cycles_per_s"], -1)]
+        for name, new, was, sign in checks:
+            if not new or not was: continue
+            change = (new - was) / was * 100
+            worse = change * sign > tolerance
+            print(f"{key:>6} symbols  {name:<11} {was:10.3f} -> {new:10.3f}  {change:+6.1f}%{'  ⚠️' if worse else ''}")
+            if worse: regressions.append((key, name, change))
+    return regressions
+
+def main(argv=None):
+    import argparse
+    p = argparse.ArgumentParser(description="Scan-cycle benchmark against a synthetic MetaTrader5 terminal.")
+    p.add_argument("--sizes", default="10,100,1000,10000", help="comma separated universe sizes")
+    p.add_argument("--cycles", type=int, default=0, help="warm cycles per size (default: scaled to the size)")
+    p.add_argument("--step", type=int, default=60, help="virtual seconds between cycles (default 60, H1 bars)")
+    p.add_argument("--seed", type=int, default=7)
+    p.add_argument("--workers", type=int, default=0, help="override FETCH_WORKERS")
+    p.add_argument("--out", default="bench_baseline.json", help="where to write the results")
+    p.add_argument("--compare", metavar="JSON", help="previous results to diff against")
+    p.add_argument("--tolerance", type=float, default=20.0, help="%% change counted as a regression")
+    args = p.parse_args(argv)
+
+    results = {
+        "meta": {"taken": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                 "python": platform.python_version(), "numpy": np.__version__, "platform": platform.platform(),
+                 "timeframe": PropGuardConfig.TIMEFRAME, "step": args.step, "seed": args.seed,
+                 "fetch_workers": args.workers or PropGuardConfig.FETCH_WORKERS,
+                 "engine": scanner_engine.__file__},
+        "cases": {},
+    }
+    for n in (int(x) for x in args.sizes.split(",")):
+        cycles = args.cycles or DEFAULT_CYCLES.get(n, 50)
+        case = run_case(n, cycles, args.step, args.seed, args.workers)
+        results["cases"][str(n)] = case
+        cyc = case["stages"].get("cycle", {})
+        print(f"{n:>6} symbols  cold {case['cold_start_s']:7.2f}s  {case['cycles_per_s']:8.1f} cycles/s  "
+              f"cycle p50/p95/p99 {cyc.get('p50_ms', 0):.2f}/{cyc.get('p95_ms', 0):.2f}/{cyc.get('p99_ms', 0):.2f} ms",
+              flush=True)
+
+    with open(args.out, "w") as f: json.dump(results, f, indent=1)
+    print(f"Results written to {args.out}")
+    if args.compare:
+        with open(args.compare) as f: baseline = json.load(f)
+        if compare(results, baseline, args.tolerance): return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,179 +1,284 @@
 import sys
-import MetaTrader5 as mt5
-import pandas as pd
-import pandas_ta as ta
 import time
-from datetime import datetime
-from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
-                             QHBoxLayout, QLabel, QPushButton, QTableWidget, 
-                             QTableWidgetItem, QGroupBox, QCheckBox, QDoubleSpinBox, 
-                             QTextEdit, QMessageBox, QHeaderView, QScrollArea, 
-                             QSplitter, QGridLayout, QMenu)
-from PyQt6.QtCore import QThread, pyqtSignal, pyqtSlot, Qt
-from PyQt6.QtGui import QColor, QFont, QAction
+from bisect import bisect_left
+from scanner_engine import PropGuardConfig, ScanEngine, SymbolUniverse, STARTUP, signal_summary
 
-# ==========================================
-# 1️⃣ CONFIGURATION
-# ==========================================
-class PropGuardConfig:
-    ASSETS = {
-        # Add your crosses here inside the brackets!
-        "FOREX": [
-            "EURUSD", "GBPUSD", "USDJPY", "USDCAD", "AUDUSD", "NZDUSD", "USDCHF",
-            "GBPJPY", "EURJPY", "EURAUD", "GBPAUD", "EURGBP", "AUDJPY"  # <--- Added these
-        ],
-        "INDICES": ["US30", "NAS100", "GER40", "SPX500"],
-        "METALS": ["XAUUSD", "XAGUSD"],
-        "ENERGY": ["USOIL", "UKOIL"],
-        "CRYPTO": ["BTCUSD", "ETHUSD", "SOLUSD", "XRPUSD"]
-    }
-    ATR_PERIOD = 14
-    ATR_MULTIPLIER = 1.5
-    LOOKBACK = 20
-    EMA_PERIOD = 200
-    RSI_PERIOD = 14
-    ADX_PERIOD = 14
+with STARTUP.phase("import PyQt6"):
+    from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
+                                 QHBoxLayout, QLabel, QPushButton, QTableView, 
+                                 QGroupBox, QDoubleSpinBox, QTreeView, QLineEdit,
+                                 QPlainTextEdit, QMessageBox, QHeaderView, 
+                                 QSplitter, QMenu)
+    from PyQt6.QtCore import (QThread, QTimer, Qt, QAbstractTableModel, QAbstractItemModel,
+                              QModelIndex, pyqtSignal)
+    from PyQt6.QtGui import QColor, QFont, QAction
 
 # ==========================================
-# 2️⃣ QUANT ENGINE
+# 1️⃣ ENGINE THREAD
 # ==========================================
 class ScannerWorker(QThread):
-    log_signal = pyqtSignal(str, str)
-    stats_signal = pyqtSignal(dict)
-    scanner_signal = pyqtSignal(list, str) 
-    
-    def __init__(self):
+    # Runs the headless ScanEngine on a Qt thread; the GUI is just one of its consumers
+    def __init__(self, source=None):
         super().__init__()
-        self.is_running = False
-        self.active_symbols = []
-        self.risk_per_trade = 0.5
-        self.rr_ratio = 1.5
-        self.timeframe = mt5.TIMEFRAME_H1
-        self.initial_equity = 0.0
-
-    def set_config(self, symbols, risk, rr):
-        self.active_symbols = symbols
-        self.risk_per_trade = risk
-        self.rr_ratio = rr
-        self.log_signal.emit(f"🧮 Quant Engine Loaded: {len(symbols)} Pairs | Risk: {risk}%", "cyan")
+        self.engine = ScanEngine(source)
 
     def run(self):
-        if not mt5.initialize():
-            self.log_signal.emit("❌ MT5 Init Failed", "red")
-            return
-        
-        self.initial_equity = mt5.account_info().equity
-        self.is_running = True
-        self.log_signal.emit("✅ Scanner Started. Analyzing...", "lime")
-
-        while self.is_running:
-            acct = mt5.account_info()
-            if acct:
-                stats = {
-                    "balance": acct.balance,
-                    "equity": acct.equity,
-                    "daily_pl": acct.equity - self.initial_equity
-                }
-                self.stats_signal.emit(stats)
-            
-            opportunities = []
-            for symbol in self.active_symbols:
-                data = self.analyze_symbol(symbol)
-                if data: opportunities.append(data)
-            
-            opportunities.sort(key=lambda x: x['score'], reverse=True)
-            timestamp = datetime.now().strftime("%H:%M:%S")
-            self.scanner_signal.emit(opportunities, timestamp)
-            
-            time.sleep(1) 
-
-        mt5.shutdown()
-        self.log_signal.emit("⛔ Scanner Stopped", "orange")
-
-    def analyze_symbol(self, symbol):
-        try:
-            bars = 250
-            rates = mt5.copy_rates_from_pos(symbol, self.timeframe, 0, bars)
-            if rates is None or len(rates) < bars: return None
-            
-            df = pd.DataFrame(rates)
-            df['ema'] = df.ta.ema(length=PropGuardConfig.EMA_PERIOD)
-            df['atr'] = df.ta.atr(length=PropGuardConfig.ATR_PERIOD)
-            df['rsi'] = df.ta.rsi(length=PropGuardConfig.RSI_PERIOD)
-            adx_obj = df.ta.adx(length=PropGuardConfig.ADX_PERIOD)
-            df['adx'] = adx_obj[f"ADX_{PropGuardConfig.ADX_PERIOD}"]
-            donchian = df.ta.donchian(lower_length=PropGuardConfig.LOOKBACK, upper_length=PropGuardConfig.LOOKBACK)
-            df = pd.concat([df, donchian], axis=1)
-            
-            curr = df.iloc[-1]
-            tick = mt5.symbol_info_tick(symbol)
-            if not tick: return None
-
-            bias = "NEUTRAL"
-            if curr['close'] > curr['ema']: bias = "BULLISH"
-            elif curr['close'] < curr['ema']: bias = "BEARISH"
-
-            # SCORING
-            ema_dist = abs(curr['close'] - curr['ema'])
-            trend_str = min(ema_dist / (curr['atr'] * 2.0), 1.0)
-            adx_norm = min(max((curr['adx'] - 20) / 25, 0), 1)
-            score_trend = (0.6 * trend_str) + (0.4 * adx_norm)
-
-            score_mom = 0.0
-            if bias == "BULLISH": score_mom = max(min((curr['rsi'] - 50) / 25, 1), 0)
-            elif bias == "BEARISH": score_mom = max(min((50 - curr['rsi']) / 25, 1), 0)
-
-            atr_pct = curr['atr'] / curr['close']
-            score_vol = min(max((atr_pct - 0.0005) / 0.002, 0), 1)
-
-            dcu = curr[f"DCU_{PropGuardConfig.LOOKBACK}_{PropGuardConfig.LOOKBACK}"]
-            dcl = curr[f"DCL_{PropGuardConfig.LOOKBACK}_{PropGuardConfig.LOOKBACK}"]
-            dist_to_break = abs(dcu - tick.ask) if bias == "BULLISH" else abs(tick.bid - dcl)
-            score_struct = 1.0 - min(dist_to_break / (curr['atr'] * 1.5), 1.0)
-
-            sym_info = mt5.symbol_info(symbol)
-            spread_points = (tick.ask - tick.bid) / sym_info.point
-            atr_points = curr['atr'] / sym_info.point
-            score_liq = max(1.0 - (spread_points / (atr_points * 0.2)), 0.0)
-
-            final_score = 100 * ((0.30 * score_trend) + (0.20 * score_mom) + (0.15 * score_vol) + (0.25 * score_struct) + (0.10 * score_liq))
-            final_score = round(final_score, 1)
-
-            if bias == "BULLISH":
-                entry = tick.ask
-                sl = entry - (curr['atr'] * PropGuardConfig.ATR_MULTIPLIER)
-                tp = entry + ((entry - sl) * self.rr_ratio)
-            else:
-                entry = tick.bid
-                sl = entry + (curr['atr'] * PropGuardConfig.ATR_MULTIPLIER)
-                tp = entry - ((sl - entry) * self.rr_ratio)
-
-            sl_points = abs(entry - sl) / sym_info.point
-            lot_size = self.calculate_lot(symbol, sl_points)
-
-            return {
-                "symbol": symbol, "score": final_score, "bias": bias, "price": entry, "sl": sl, "tp": tp, 
-                "lots": lot_size, "adx": curr['adx'], "rsi": curr['rsi'], "atr": curr['atr'], 
-                "spread": spread_points, "ema_dist": trend_str
-            }
-        except Exception:
-            return None
+        self.engine.run()
+
+class UniverseLoader(QThread):
+    # Pulls the broker's symbol list off the GUI thread and sorts it into categories
+    loaded = pyqtSignal(object)   # {category: [symbols]}, or None on failure
 
-    def calculate_lot(self, symbol, sl_points):
-        balance = mt5.account_info().balance
-        risk_money = balance * (self.risk_per_trade / 100.0)
-        sym_info = mt5.symbol_info(symbol)
-        if not sym_info: return 0.0
-        tick_value = sym_info.trade_tick_value
-        if tick_value == 0 or sl_points == 0: return 0.0
-        raw_lot = risk_money / (sl_points * tick_value)
-        step = sym_info.volume_step
-        lot = round(raw_lot / step) * step
-        return max(lot, sym_info.volume_min) if lot <= sym_info.volume_max else sym_info.volume_max
+    def __init__(self, engine):
+        super().__init__()
+        self.engine = engine
+
+    def run(self):
+        universe = self.engine.load_universe()
+        self.loaded.emit(universe.categorize() if universe else None)
 
 # ==========================================
-# 3️⃣ GUI
+# 2️⃣ GUI
 # ==========================================
+class ScanTableModel(QAbstractTableModel):
+    # Scoreboard model. apply() diffs each snapshot against what is on screen: row
+    # removes/inserts for symbols leaving/joining, one layout change for the new order
+    # and dataChanged for cells whose text changed, so selection and scroll position
+    # survive every refresh.
+    HEADERS = ["Symbol", "Score", "Trend", "Signal", "Entry", "SL", "TP", "Lot Size"]
+
+    def __init__(self, trade_score):
+        super().__init__()
+        self.trade_score = trade_score  # the engine's TRADE threshold (it may come from a weights file)
+        self.rows = []             # symbols in display order
+        self.cells = {}            # symbol -> tuple of display strings
+        self.bands = {}            # symbol -> 2 (>= TRADE_SCORE), 1 (>= WATCH_SCORE), 0
+        self.data_map = {}         # symbol -> full row, for the AI prompt
+        self.previous_scores = {}  # symbol -> score on the previous refresh, for the arrows
+        self.score_bg = (QColor("#330000"), QColor("#555500"), QColor("#00ff00"))
+        self.score_fg = (QColor("#e0e0e0"), QColor("#e0e0e0"), QColor("#000000"))
+        self.lot_fg = QColor("#00ffff")
+        self.lot_font = QFont("Arial", 10, QFont.Weight.Bold)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid(): return None
+        sym, col = self.rows[index.row()], index.column()
+        if role == Qt.ItemDataRole.DisplayRole: return self.cells[sym][col]
+        if col == 1:
+            if role == Qt.ItemDataRole.BackgroundRole: return self.score_bg[self.bands[sym]]
+            if role == Qt.ItemDataRole.ForegroundRole: return self.score_fg[self.bands[sym]]
+            if role == Qt.ItemDataRole.TextAlignmentRole: return Qt.AlignmentFlag.AlignCenter
+        if col == 7:
+            if role == Qt.ItemDataRole.ForegroundRole: return self.lot_fg
+            if role == Qt.ItemDataRole.FontRole: return self.lot_font
+        return None
+
+    def symbol_at(self, row):
+        return self.rows[row] if 0 <= row < len(self.rows) else None
+
+    def format_row(self, data):
+        sym, score = data['symbol'], data['score']
+        prev_score = self.previous_scores.get(sym, score)
+        arrow = " ▲" if score > prev_score else " ▼" if score < prev_score else ""
+        self.previous_scores[sym] = score
+        trade, watch = self.trade_score, PropGuardConfig.WATCH_SCORE
+        band = 2 if score >= trade else 1 if score >= watch else 0
+        sig = ("WAIT", "👀 WATCH", "🔥 TRADE")[band]
+        return (sym, f"{score}{arrow}", f"{data['bias']} (ADX:{data['adx']:.0f})", sig,
+                f"{data['price']:.5f}", f"{data['sl']:.5f}", f"{data['tp']:.5f}", str(data['lots'])), band
+
+    def apply(self, opportunities):
+        target = [d['symbol'] for d in opportunities]
+        wanted = set(target)
+
+        # Leaving symbols go in contiguous runs, last run first so row numbers stay valid
+        row = len(self.rows) - 1
+        while row >= 0:
+            if self.rows[row] in wanted:
+                row -= 1
+                continue
+            last = row
+            while row > 0 and self.rows[row - 1] not in wanted: row -= 1
+            self.beginRemoveRows(QModelIndex(), row, last)
+            for sym in self.rows[row:last + 1]:
+                del self.cells[sym], self.bands[sym]
+                self.data_map.pop(sym, None)
+                self.previous_scores.pop(sym, None)
+            del self.rows[row:last + 1]
+            self.endRemoveRows()
+            row -= 1
+
+        fresh = [s for s in target if s not in self.cells]
+        if fresh:
+            first = len(self.rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(fresh) - 1)
+            for sym in fresh:
+                self.rows.append(sym)
+                self.cells[sym] = (None,) * len(self.HEADERS)
+                self.bands[sym] = -1
+            self.endInsertRows()
+
+        if self.rows != target:
+            # One O(n) relayout instead of a move per out-of-place row
+            hint = QAbstractItemModel.LayoutChangeHint.VerticalSortHint
+            self.layoutAboutToBeChanged.emit([], hint)
+            pos = {sym: i for i, sym in enumerate(target)}
+            old = self.persistentIndexList()
+            new = [self.index(pos[self.rows[idx.row()]], idx.column()) for idx in old]
+            self.rows = target
+            self.changePersistentIndexList(old, new)
+            self.layoutChanged.emit([], hint)
+
+        for row, data in enumerate(opportunities):
+            sym = data['symbol']
+            self.data_map[sym] = data
+            cells, band = self.format_row(data)
+            old = self.cells[sym]
+            changed = [c for c in range(len(cells)) if cells[c] != old[c]]
+            if band != self.bands[sym]: changed.append(1)
+            self.cells[sym], self.bands[sym] = cells, band
+            if changed:
+                self.dataChanged.emit(self.index(row, min(changed)), self.index(row, max(changed)))
+
+class SymbolTreeModel(QAbstractItemModel):
+    # Symbol picker: category rows with their symbols as children. Check state is one
+    # set plus a per-category counter, so a toggle is O(1) whatever the universe size.
+    # Each category keeps its symbols sorted by search key; the prefix filter is a
+    # bisect into that list (narrowed from the previous match while typing ahead).
+    CHECKED = Qt.CheckState.Checked
+
+    def __init__(self, groups):
+        super().__init__()
+        self.checked = set()
+        self.prefix = ""
+        self.set_groups(groups)
+
+    def set_groups(self, groups):
+        self.beginResetModel()
+        self.groups = list(groups)
+        self.members, self.keys = {}, {}
+        for g, syms in groups.items():
+            pairs = sorted((SymbolUniverse.key(s), s) for s in set(syms))
+            self.keys[g] = [k for k, _ in pairs]
+            self.members[g] = [s for _, s in pairs]
+        self.owner = {s: g for g in reversed(self.groups) for s in self.members[g]}
+        self.checked &= set(self.owner)
+        self.checked_count = {g: 0 for g in self.groups}
+        for s in self.checked: self.checked_count[self.owner[s]] += 1
+        self.shown = {g: (0, len(self.members[g])) for g in self.groups}
+        self.apply_filter(self.prefix, narrow=False)
+        self.endResetModel()
+
+    def apply_filter(self, prefix, narrow):
+        key = SymbolUniverse.key(prefix)
+        for g in self.groups:
+            keys = self.keys[g]
+            lo, hi = self.shown[g] if narrow else (0, len(keys))
+            start = bisect_left(keys, key, lo, hi)
+            end = bisect_left(keys, key + "\uffff", start, hi) if key else hi
+            self.shown[g] = (start, end)
+        self.prefix = prefix
+        self.visible = [g for g in self.groups if self.shown[g][1] > self.shown[g][0]]
+        self.visible_row = {g: i for i, g in enumerate(self.visible)}
+
+    def set_prefix(self, prefix):
+        narrow = SymbolUniverse.key(prefix).startswith(SymbolUniverse.key(self.prefix))
+        self.beginResetModel()
+        self.apply_filter(prefix, narrow)
+        self.endResetModel()
+
+    def selected(self):
+        return list(self.checked)
+
+    def check(self, symbols):
+        # Check symbols by name (e.g. restoring a selection); unknown names are ignored
+        for s in symbols:
+            if s in self.owner and s not in self.checked: self.set_checked(s, True)
+
+    def set_checked(self, symbol, on):
+        g = self.owner[symbol]
+        if on: self.checked.add(symbol)
+        else: self.checked.discard(symbol)
+        self.checked_count[g] += 1 if on else -1
+        return g
+
+    def index(self, row, column=0, parent=QModelIndex()):
+        if not parent.isValid():
+            if 0 <= row < len(self.visible): return self.createIndex(row, column)
+        elif parent.internalPointer() is None:
+            g = self.visible[parent.row()]
+            lo, hi = self.shown[g]
+            if 0 <= row < hi - lo: return self.createIndex(row, column, g)
+        return QModelIndex()
+
+    def parent(self, index):
+        g = index.internalPointer() if index.isValid() else None
+        return QModelIndex() if g is None else self.createIndex(self.visible_row[g], 0)
+
+    def rowCount(self, parent=QModelIndex()):
+        if not parent.isValid(): return len(self.visible)
+        if parent.internalPointer() is not None: return 0
+        lo, hi = self.shown[self.visible[parent.row()]]
+        return hi - lo
+
+    def columnCount(self, parent=QModelIndex()):
+        return 1
+
+    def symbol(self, index):
+        g = index.internalPointer()
+        return self.members[g][self.shown[g][0] + index.row()]
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid(): return None
+        if index.internalPointer() is None:
+            g = self.visible[index.row()]
+            n, total = self.checked_count[g], len(self.members[g])
+            if role == Qt.ItemDataRole.DisplayRole: return f"{g}  ({n}/{total})"
+            if role == Qt.ItemDataRole.CheckStateRole:
+                return (Qt.CheckState.Unchecked if n == 0 else self.CHECKED if n == total
+                        else Qt.CheckState.PartiallyChecked)
+            return None
+        sym = self.symbol(index)
+        if role == Qt.ItemDataRole.DisplayRole: return sym
+        if role == Qt.ItemDataRole.CheckStateRole:
+            return self.CHECKED if sym in self.checked else Qt.CheckState.Unchecked
+        return None
+
+    def flags(self, index):
+        if not index.isValid(): return Qt.ItemFlag.NoItemFlags
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsUserCheckable
+
+    def setData(self, index, value, role=Qt.ItemDataRole.CheckStateRole):
+        if role != Qt.ItemDataRole.CheckStateRole or not index.isValid(): return False
+        on = Qt.CheckState(value) == self.CHECKED
+        if index.internalPointer() is None:
+            # Bulk select: the whole category, or only its matches while a search is active
+            g = self.visible[index.row()]
+            lo, hi = self.shown[g]
+            for s in self.members[g][lo:hi]:
+                if (s in self.checked) != on: self.set_checked(s, on)
+            group_index = index
+            if hi > lo: self.dataChanged.emit(self.index(0, 0, index), self.index(hi - lo - 1, 0, index))
+        else:
+            sym = self.symbol(index)
+            if (sym in self.checked) == on: return True
+            self.set_checked(sym, on)
+            group_index = index.parent()
+            self.dataChanged.emit(index, index)
+        self.dataChanged.emit(group_index, group_index)
+        return True
+
 class ScannerGUI(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -182,13 +287,12 @@ class ScannerGUI(QMainWindow):
         self.setStyleSheet(self.get_style())
         
         self.worker = ScannerWorker()
-        self.worker.log_signal.connect(self.log)
-        self.worker.stats_signal.connect(self.update_stats)
-        self.worker.scanner_signal.connect(self.update_table)
-        
-        self.selected_symbols = set()
-        self.previous_scores = {} 
-        self.latest_data_map = {} # Store full data for AI prompt
+        self.engine = self.worker.engine
+
+        # The GUI pulls the newest snapshot at a capped rate instead of rendering every cycle
+        self.ui_timer = QTimer(self)
+        self.ui_timer.timeout.connect(self.pull_snapshot)
+        self.ui_timer.start(int(1000 / PropGuardConfig.UI_MAX_FPS))
         
         w = QWidget()
         self.setCentralWidget(w)
@@ -198,11 +302,12 @@ class ScannerGUI(QMainWindow):
         self.create_main_area(lay)
         self.create_legend(lay) 
         self.create_log_area(lay)
+        self.create_status_bar()
         
     def get_style(self):
         return """
             QMainWindow { background-color: #121212; color: #e0e0e0; }
-            QTableWidget { background-color: #1a1a1a; gridline-color: #333; font-size: 14px; selection-background-color: #333; }
+            QTableView { background-color: #1a1a1a; gridline-color: #333; font-size: 14px; selection-background-color: #333; }
             QHeaderView::section { background-color: #252525; padding: 6px; border: 1px solid #333; font-weight: bold; }
             QGroupBox { border: 1px solid #444; margin-top: 10px; font-weight: bold; color: #00e5ff; padding-top: 15px; }
             QGroupBox::title { subcontrol-origin: margin; left: 10px; padding: 0 5px; background: #121212; }
@@ -233,32 +338,34 @@ class ScannerGUI(QMainWindow):
     def create_main_area(self, parent):
         splitter = QSplitter(Qt.Orientation.Horizontal)
         
-        scroll = QScrollArea()
-        scroll.setWidgetResizable(True)
-        scroll.setMinimumWidth(320)
-        scroll.setMaximumWidth(400)
         left_widget = QWidget(); left_layout = QVBoxLayout(left_widget)
+        left_widget.setMinimumWidth(320)
+        left_widget.setMaximumWidth(400)
+
+        self.txt_search = QLineEdit()
+        self.txt_search.setPlaceholderText("🔍 Search symbols...")
+        self.txt_search.setClearButtonEnabled(True)
+        self.txt_search.textChanged.connect(self.on_search)
+        left_layout.addWidget(self.txt_search)
+
+        self.symbol_model = SymbolTreeModel(PropGuardConfig.ASSETS)
+        self.symbol_tree = QTreeView()
+        self.symbol_tree.setModel(self.symbol_model)
+        self.symbol_tree.setHeaderHidden(True)
+        self.symbol_tree.setUniformRowHeights(True)
+        self.symbol_tree.expandAll()
+        left_layout.addWidget(self.symbol_tree, 1)
+
+        self.btn_universe = QPushButton("🌐 Load Broker Symbols")
+        self.btn_universe.clicked.connect(self.load_universe)
+        left_layout.addWidget(self.btn_universe)
+        self.universe_loader = UniverseLoader(self.engine)
+        self.universe_loader.loaded.connect(self.on_universe_loaded)
+        splitter.addWidget(left_widget)
         
-        self.checks = {}
-        for cat, syms in PropGuardConfig.ASSETS.items():
-            gb = QGroupBox(cat)
-            gl = QGridLayout(gb)
-            r, c = 0, 0
-            for s in syms:
-                chk = QCheckBox(s)
-                chk.stateChanged.connect(self.on_check)
-                self.checks[s] = chk
-                gl.addWidget(chk, r, c)
-                c += 1
-                if c > 1: c=0; r+=1
-            left_layout.addWidget(gb)
-        left_layout.addStretch()
-        scroll.setWidget(left_widget)
-        splitter.addWidget(scroll)
-        
-        self.table = QTableWidget()
-        self.table.setColumnCount(8)
-        self.table.setHorizontalHeaderLabels(["Symbol", "Score", "Trend", "Signal", "Entry", "SL", "TP", "Lot Size"])
+        self.model = ScanTableModel(self.engine.trade_score)
+        self.table = QTableView()
+        self.table.setModel(self.model)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         
         # Enable Right Click Context Menu
@@ -273,44 +380,95 @@ class ScannerGUI(QMainWindow):
         grp = QGroupBox("📋 Quant Score Guide")
         grp.setMaximumHeight(80)
         layout = QHBoxLayout(grp)
-        l1 = QLabel("🟩 85-100: INSTITUTIONAL"); l1.setStyleSheet("color: #0f0; font-weight: bold;")
-        l2 = QLabel("🟨 70-84: VALID SETUP"); l2.setStyleSheet("color: #ff0; font-weight: bold;")
-        l3 = QLabel("🟥 <70: WEAK"); l3.setStyleSheet("color: #f44; font-weight: bold;")
+        trade, watch = self.engine.trade_score, PropGuardConfig.WATCH_SCORE
+        l1 = QLabel(f"🟩 {trade:g}-100: INSTITUTIONAL"); l1.setStyleSheet("color: #0f0; font-weight: bold;")
+        l2 = QLabel(f"🟨 {watch:g}-{trade:g}: VALID SETUP"); l2.setStyleSheet("color: #ff0; font-weight: bold;")
+        l3 = QLabel(f"🟥 <{watch:g}: WEAK"); l3.setStyleSheet("color: #f44; font-weight: bold;")
         layout.addWidget(l1); layout.addWidget(l2); layout.addWidget(l3); layout.addStretch()
+        # Live outcome of past signals per score band, from the engine's signal journal
+        self.lbl_signals = QLabel("🎯 Live hit rate: no signals yet")
+        self.lbl_signals.setStyleSheet("color: #aaa; font-family: Consolas;")
+        layout.addWidget(self.lbl_signals)
         parent.addWidget(grp)
 
     def create_log_area(self, parent):
-        self.txt_log = QTextEdit()
+        self.txt_log = QPlainTextEdit()
         self.txt_log.setMaximumHeight(100)
         self.txt_log.setReadOnly(True)
+        self.txt_log.setMaximumBlockCount(PropGuardConfig.LOG_MAX_LINES)
         self.txt_log.setStyleSheet("background: #000; color: #0f0; font-family: Consolas;")
         parent.addWidget(self.txt_log)
 
-    def on_check(self):
-        self.selected_symbols = {s for s, chk in self.checks.items() if chk.isChecked()}
+        self.log_timer = QTimer(self)
+        self.log_timer.timeout.connect(self.flush_log)
+        self.log_timer.start(int(1000 / PropGuardConfig.LOG_FLUSH_HZ))
+
+    def create_status_bar(self):
+        bar = self.statusBar()
+        bar.setStyleSheet("color: #888; font-family: Consolas;")
+        btn = QPushButton("💾 Dump Latency")
+        btn.setStyleSheet("padding: 2px 8px;")
+        btn.clicked.connect(self.dump_latency)
+        bar.addPermanentWidget(btn)
+
+        self.latency_timer = QTimer(self)
+        self.latency_timer.timeout.connect(lambda: bar.showMessage(self.status_line()))
+        self.latency_timer.start(int(1000 / PropGuardConfig.LATENCY_STATUS_HZ))
+
+    def status_line(self):
+        # Latency percentiles, plus the snapshots published faster than UI_MAX_FPS and never drawn
+        parts = [self.engine.latency.status_line()]
+        skipped = self.engine.snapshots.dropped
+        if skipped: parts.append(f"🖼 {skipped} snapshots skipped")
+        return "  |  ".join(p for p in parts if p)
+
+    def dump_latency(self):
+        path = PropGuardConfig.LATENCY_DUMP or "latency.json"
+        try:
+            self.engine.latency.dump(path)
+            self.log(f"💾 Latency percentiles written to {path}", "cyan")
+        except OSError as e:
+            self.log(f"⚠️ Latency dump failed: {e}", "orange")
+
+    def on_search(self, text):
+        self.symbol_model.set_prefix(text)
+        if text: self.symbol_tree.expandAll()
+
+    def load_universe(self):
+        if self.universe_loader.isRunning(): return
+        self.btn_universe.setEnabled(False)
+        self.btn_universe.setText("⏳ Loading...")
+        self.universe_loader.start()
+
+    def on_universe_loaded(self, groups):
+        self.btn_universe.setEnabled(True)
+        self.btn_universe.setText("🌐 Load Broker Symbols")
+        if not groups: return
+        # Carry the current picks over to the broker's spelling of each name
+        picks = [self.engine.universe.resolve(s) for s in self.symbol_model.selected()]
+        self.symbol_model.set_groups(groups)
+        self.symbol_model.check(picks)
+        self.log(f"🌐 Broker universe: {len(self.symbol_model.owner)} symbols in {len(groups)} groups", "cyan")
 
     def toggle_scan(self):
-        if not self.worker.is_running:
-            if not self.selected_symbols:
+        if not self.engine.is_running:
+            symbols = self.symbol_model.selected()
+            if not symbols:
                 QMessageBox.warning(self, "Error", "Select symbols first.")
                 return
-            self.worker.set_config(list(self.selected_symbols), self.spin_risk.value(), self.spin_rr.value())
+            self.engine.set_config(symbols, self.spin_risk.value(), self.spin_rr.value())
             self.worker.start()
             self.btn_scan.setText("⛔ STOP SCANNER")
             self.btn_scan.setStyleSheet("background-color: #8b0000;")
         else:
-            self.worker.is_running = False
+            self.engine.stop()
             self.btn_scan.setText("▶ START SCANNER")
             self.btn_scan.setStyleSheet("background-color: #006400;")
 
     # 🆕 AI BRIDGE FUNCTIONALITY
     def open_context_menu(self, position):
-        row = self.table.rowAt(position.y())
-        if row == -1: return
-        
-        sym_item = self.table.item(row, 0)
-        if not sym_item: return
-        symbol = sym_item.text()
+        symbol = self.model.symbol_at(self.table.rowAt(position.y()))
+        if not symbol: return
         
         menu = QMenu()
         copy_ai_action = QAction(f"📋 Copy '{symbol}' AI Prompt", self)
@@ -319,7 +477,7 @@ class ScannerGUI(QMainWindow):
         menu.exec(self.table.viewport().mapToGlobal(position))
 
     def copy_for_ai(self, symbol):
-        data = self.latest_data_map.get(symbol)
+        data = self.model.data_map.get(symbol)
         if not data: return
         
         prompt = (
@@ -335,55 +493,42 @@ class ScannerGUI(QMainWindow):
         QApplication.clipboard().setText(prompt)
         self.log(f"📋 AI Prompt for {symbol} copied to clipboard!", "cyan")
 
-    @pyqtSlot(list, str)
+    def pull_snapshot(self):
+        snap = self.engine.snapshots.take()
+        if snap is None: return
+        start = time.perf_counter()
+        self.update_stats(snap['stats'])
+        self.update_table(snap['rows'], snap['timestamp'])
+        self.table.viewport().repaint()
+        self.engine.latency.record("render/frame", time.perf_counter() - start)
+
     def update_table(self, opportunities, timestamp):
         self.lbl_update.setText(f"Last Scan: {timestamp} ●")
         self.lbl_update.setStyleSheet("color: #00ff00; font-family: Consolas; font-weight: bold;")
-        self.table.setRowCount(0)
-        
-        for row, data in enumerate(opportunities):
-            self.table.insertRow(row)
-            sym = data['symbol']
-            self.latest_data_map[sym] = data # Store for AI Prompt
-            
-            score = data['score']
-            prev_score = self.previous_scores.get(sym, score)
-            arrow = " ▲" if score > prev_score else " ▼" if score < prev_score else ""
-            self.previous_scores[sym] = score 
-            
-            self.table.setItem(row, 0, QTableWidgetItem(sym))
-            
-            score_item = QTableWidgetItem(f"{score}{arrow}")
-            score_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            bg = "#00ff00" if score >= 85 else "#555500" if score >= 70 else "#330000"
-            fg = "#000000" if score >= 85 else "#e0e0e0"
-            score_item.setBackground(QColor(bg)); score_item.setForeground(QColor(fg))
-            self.table.setItem(row, 1, score_item)
-            
-            self.table.setItem(row, 2, QTableWidgetItem(f"{data['bias']} (ADX:{data['adx']:.0f})"))
-            
-            sig = "🔥 TRADE" if score >= 85 else "👀 WATCH" if score >= 70 else "WAIT"
-            self.table.setItem(row, 3, QTableWidgetItem(sig))
-            
-            self.table.setItem(row, 4, QTableWidgetItem(f"{data['price']:.5f}"))
-            self.table.setItem(row, 5, QTableWidgetItem(f"{data['sl']:.5f}"))
-            self.table.setItem(row, 6, QTableWidgetItem(f"{data['tp']:.5f}"))
-            
-            lot_item = QTableWidgetItem(str(data['lots']))
-            lot_item.setForeground(QColor("#00ffff")); lot_item.setFont(QFont("Arial", 10, QFont.Weight.Bold))
-            self.table.setItem(row, 7, lot_item)
-
-    @pyqtSlot(str, str)
+        self.model.apply(opportunities)
+
     def log(self, msg, col):
-        t = datetime.now().strftime("%H:%M:%S")
-        self.txt_log.append(f'<span style="color:{col}">[{t}] {msg}</span>')
+        self.engine.logs.push(msg, col)
+
+    def flush_log(self):
+        for t, msg, col in self.engine.logs.drain():
+            self.txt_log.appendHtml(f'<span style="color:{col}">[{t}] {msg}</span>')
+
+    def on_window_visible(self):
+        STARTUP.mark("window visible")
+        for line in STARTUP.report(): self.log(line, "gray")
 
-    @pyqtSlot(dict)
     def update_stats(self, stats):
         self.lbl_bal.setText(f"Bal: ${stats['balance']:.2f}")
+        if 'signals' in stats: self.lbl_signals.setText(f"🎯 Live hit rate: {signal_summary(stats['signals'])}")
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    w = ScannerGUI()
-    w.show()
-    sys.exit(app.exec())
+    with STARTUP.phase("QApplication"):
+        app = QApplication(sys.argv)
+    with STARTUP.phase("main window"):
+        w = ScannerGUI()
+        w.show()
+    QTimer.singleShot(0, w.on_window_visible)
+    code = app.exec()
+    w.engine.logs.close()
+    sys.exit(code)
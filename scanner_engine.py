@@ -0,0 +1,1583 @@
+import time
+_IMPORT_T0 = time.perf_counter()
+import sys
+import os
+import json
+import math
+import importlib
+import threading
+import logging
+import queue
+import signal
+from logging.handlers import QueueListener, RotatingFileHandler
+from collections import deque
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from fnmatch import fnmatchcase
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+# ==========================================
+# 0️⃣ STARTUP
+# Heavy modules are imported on first use, and every import / init phase is timed
+# so slow startups show up in the log instead of being guessed at.
+# ==========================================
+class StartupTimeline:
+    def __init__(self, t0=None):
+        self.t0 = time.perf_counter() if t0 is None else t0
+        self.entries = []    # (offset from t0, duration, name)
+        self.reported = 0
+
+    def add(self, name, start, end):
+        self.entries.append((start - self.t0, end - start, name))
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, start, time.perf_counter())
+
+    def mark(self, name):
+        now = time.perf_counter()
+        self.add(name, now, now)
+
+    def report(self):
+        # Lines for the entries recorded since the previous report()
+        new = self.entries[self.reported:]
+        self.reported = len(self.entries)
+        return [f"⏱ +{off * 1000:7.1f} ms {dur * 1000:7.1f} ms  {name}" for off, dur, name in new]
+
+STARTUP = StartupTimeline(_IMPORT_T0)
+
+class LazyModule:
+    # Placeholder bound to a module-level name; the first attribute access imports the
+    # real module (timed on STARTUP) and rebinds the name, so later lookups are direct.
+    def __init__(self, name, namespace, alias):
+        self._name, self._namespace, self._alias = name, namespace, alias
+
+    def __getattr__(self, attr):
+        with STARTUP.phase(f"import {self._name}"):
+            module = importlib.import_module(self._name)
+        self._namespace[self._alias] = module
+        return getattr(module, attr)
+
+np = LazyModule("numpy", globals(), "np")
+
+# ==========================================
+# 1️⃣ CONFIGURATION
+# ==========================================
+class PropGuardConfig:
+    ASSETS = {
+        # Add your crosses here inside the brackets!
+        "FOREX": [
+            "EURUSD", "GBPUSD", "USDJPY", "USDCAD", "AUDUSD", "NZDUSD", "USDCHF",
+            "GBPJPY", "EURJPY", "EURAUD", "GBPAUD", "EURGBP", "AUDJPY"  # <--- Added these
+        ],
+        "INDICES": ["US30", "NAS100", "GER40", "SPX500"],
+        "METALS": ["XAUUSD", "XAGUSD"],
+        "ENERGY": ["USOIL", "UKOIL"],
+        "CRYPTO": ["BTCUSD", "ETHUSD", "SOLUSD", "XRPUSD"]
+    }
+    # Whole-category scans: masks matched against the broker's symbol path
+    # ("Forex\\Majors\\EURUSD"), case-insensitive, "!" excludes
+    UNIVERSE_GROUPS = {
+        "FOREX": ["*Forex*"],
+        "INDICES": ["*Indices*", "*Index*", "*Cash*"],
+        "METALS": ["*Metal*"],
+        "ENERGY": ["*Energ*", "*Oil*"],
+        "CRYPTO": ["*Crypto*"],
+    }
+    SYMBOL_SUFFIX_MAX = 4    # extra characters a broker may add to a name (EURUSD.r, EURUSDm, EURUSD-ECN)
+    TIMEFRAME = "H1"
+    TIMEFRAME_SECONDS = {"M1": 60, "M5": 300, "M15": 900, "M30": 1800, "H1": 3600, "H4": 14400, "D1": 86400}
+    HISTORY_BARS = 250
+    BAR_STORE = "bar_store"  # directory keeping closed bars between runs (None = download every start)
+    ATR_PERIOD = 14
+    ATR_MULTIPLIER = 1.5
+    LOOKBACK = 20
+    EMA_PERIOD = 200
+    RSI_PERIOD = 14
+    ADX_PERIOD = 14
+    # Weights of the score components (sum 1.0 keeps the score on 0-100)
+    SCORE_WEIGHTS = {"trend": 0.30, "mom": 0.20, "vol": 0.15, "struct": 0.25, "liq": 0.10}
+    SCORE_WEIGHTS_FILE = None  # e.g. "walkforward.json" from walkforward.py: weights and TRADE_SCORE to use
+    TRADE_SCORE = 85         # score at which a row is a TRADE
+    WATCH_SCORE = 70         # score at which a row is worth watching
+    SPEC_TTL = 3600          # seconds before a contract spec is reloaded in full
+    TICK_VALUE_TTL = 60      # seconds between tick value refreshes on cross-currency symbols
+    FETCH_WORKERS = 8        # max terminal requests in flight during the fetch stage
+    # Pre-filter: cheap tick/contract checks that keep hopeless symbols out of the heavy stage
+    PREFILTER_MAX_SPREAD_ATR = 0.2          # spread / ATR at which the liquidity score is already 0
+    PREFILTER_MAX_TICK_AGE = 900            # seconds without a tick before the market counts as closed
+    PREFILTER_BLOCKED_TRADE_MODES = (0, 3)  # SYMBOL_TRADE_MODE_DISABLED, SYMBOL_TRADE_MODE_CLOSEONLY
+    TICK_INTERVAL = 1.0      # seconds between light (tick-level) refresh cycles
+    BAR_CLOSE_GRACE = 0.25   # seconds after a broker bar boundary before the bar-close cycle
+    UI_MAX_FPS = 4           # scoreboard refreshes per second, however fast the engine runs
+    LOG_MAX_LINES = 500      # lines kept in the log pane (oldest dropped first)
+    LOG_FLUSH_HZ = 4         # log pane repaints per second
+    LOG_FILE = None          # e.g. "scanner.log" to keep the full history on disk
+    LOG_FILE_MAX_BYTES = 5_000_000
+    LOG_FILE_BACKUPS = 5
+    LATENCY_DUMP = None      # e.g. "latency.json": per-stage percentiles, rewritten every LATENCY_DUMP_EVERY s
+    LATENCY_DUMP_EVERY = 60
+    LATENCY_STATUS_HZ = 1    # status bar latency refreshes per second
+    SIGNAL_JOURNAL = "signals"              # directory of the signal outcome journals (None = track in memory only)
+    SIGNAL_BANDS = (70, 80, 85, 90, 100.1)  # live hit-rate bands; rows crossing the first edge become signals
+    SIGNAL_HORIZON = 100     # bars before an unresolved signal is closed at market, as in backtest.py
+    SIGNAL_FLUSH_EVERY = 2.0 # seconds of journal events batched into one write
+
+# ==========================================
+# 2️⃣ QUANT ENGINE
+# ==========================================
+# ------------------------------------------
+# Market data sources
+# The engine only talks to a MarketDataSource. Method names and return shapes
+# follow the MetaTrader5 module so the live adapter stays a thin pass-through;
+# timeframes are passed by config name ("H1") and mapped by each adapter.
+# ------------------------------------------
+class MarketDataSource:
+    finished = False   # set by finite sources (replays) once they run out of data
+
+    def initialize(self): return True
+    def shutdown(self): pass
+    def advance(self): pass             # called once at the start of every cycle
+    clock_rate = 1.0   # seconds of the source's clock per wall-clock second
+
+    def time(self): return time.time()  # the source's clock, which sleep() is measured in
+    def sleep(self, seconds): time.sleep(seconds)
+    def copy_rates_from_pos(self, symbol, timeframe, start_pos, count): raise NotImplementedError
+    def symbol_info_tick(self, symbol): raise NotImplementedError
+    def symbol_info(self, symbol): raise NotImplementedError
+    def account_info(self): raise NotImplementedError
+    def symbols_get(self): raise NotImplementedError  # every symbol the broker offers
+    def symbol_select(self, symbol): return True      # make a symbol quotable (Market Watch)
+    def store_key(self): return None                  # names the price feed in the bar store (None = don't persist)
+    def check_timeframe(self, timeframe): pass        # raises ValueError when the source can't serve it
+
+class MT5Source(MarketDataSource):
+    def __init__(self):
+        with STARTUP.phase("import MetaTrader5"):
+            import MetaTrader5
+        self.mt5 = MetaTrader5
+
+    def initialize(self): return self.mt5.initialize()
+    def shutdown(self): self.mt5.shutdown()
+
+    def copy_rates_from_pos(self, symbol, timeframe, start_pos, count):
+        return self.mt5.copy_rates_from_pos(symbol, getattr(self.mt5, f"TIMEFRAME_{timeframe}"), start_pos, count)
+
+    def symbol_info_tick(self, symbol): return self.mt5.symbol_info_tick(symbol)
+    def symbol_info(self, symbol): return self.mt5.symbol_info(symbol)
+    def account_info(self): return self.mt5.account_info()
+    def symbols_get(self): return self.mt5.symbols_get()
+    def symbol_select(self, symbol): return self.mt5.symbol_select(symbol, True)
+
+    def store_key(self):
+        acct = self.mt5.account_info()
+        return getattr(acct, "server", None) if acct else None
+
+    def copy_ticks_range(self, symbol, date_from, date_to):
+        return self.mt5.copy_ticks_range(symbol, date_from, date_to, self.mt5.COPY_TICKS_INFO)
+
+REPLAY_TICK_FIELDS = (('time_msc', '<i8'), ('bid', '<f8'), ('ask', '<f8'))
+REPLAY_ACCOUNT_FIELDS = ("balance", "equity", "currency")
+
+def record_replay(path, symbols, timeframe=PropGuardConfig.TIMEFRAME, bars=5000, days=30, source=None):
+    # Dumps bars, ticks, contract specs and the account from a live terminal into a
+    # directory ReplaySource can play back: meta.json + one <symbol>.npz per symbol.
+    source = source or MT5Source()
+    if not source.initialize(): raise RuntimeError("MT5 initialize() failed")
+    try:
+        os.makedirs(path, exist_ok=True)
+        until = datetime.now(timezone.utc)
+        specs = {}
+        for symbol in symbols:
+            rates = source.copy_rates_from_pos(symbol, timeframe, 0, bars)
+            ticks = source.copy_ticks_range(symbol, until - timedelta(days=days), until)
+            info = source.symbol_info(symbol)
+            if rates is None or ticks is None or not info: continue
+            packed = np.zeros(len(ticks), dtype=list(REPLAY_TICK_FIELDS))
+            for f, _ in REPLAY_TICK_FIELDS: packed[f] = ticks[f]
+            np.savez(os.path.join(path, f"{symbol}.npz"), rates=rates, ticks=packed)
+            specs[symbol] = {f: getattr(info, f) for f in ContractSpec.FIELDS}
+            specs[symbol]["path"] = info.path
+        acct = source.account_info()
+        meta = {"timeframe": timeframe, "symbols": specs,
+                "account": {f: getattr(acct, f) for f in REPLAY_ACCOUNT_FIELDS}}
+        with open(os.path.join(path, "meta.json"), "w") as f: json.dump(meta, f, indent=1)
+    finally:
+        source.shutdown()
+
+class ReplaySource(MarketDataSource):
+    # Plays a record_replay() directory back on a virtual clock.
+    # speed=1.0 is real time, 10.0 ten times faster; speed=None jumps straight to
+    # the next recorded tick on every cycle (as fast as the engine can go).
+    def __init__(self, path, speed=1.0):
+        with open(os.path.join(path, "meta.json")) as f: meta = json.load(f)
+        self.timeframe = meta["timeframe"]
+        self.specs = meta["symbols"]
+        self.account = meta["account"]
+        self.speed = speed
+        self.clock_rate = speed or 1.0
+        self.rates, self.ticks = {}, {}
+        for symbol in self.specs:
+            with np.load(os.path.join(path, f"{symbol}.npz")) as data:
+                self.rates[symbol], self.ticks[symbol] = data["rates"], data["ticks"]
+        self.events = np.unique(np.concatenate([t['time_msc'] for t in self.ticks.values()] or [np.zeros(0, np.int64)]))
+        self.next_event = 0
+        self.clock_ms = int(self.events[0]) if len(self.events) else 0
+        self.started_ms = self.clock_ms
+        self.wall_start = None
+
+    def initialize(self):
+        self.wall_start = time.monotonic()
+        return len(self.events) > 0
+
+    def advance(self):
+        if self.speed:
+            self.clock_ms = self.started_ms + int((time.monotonic() - self.wall_start) * 1000 * self.speed)
+            self.finished = self.clock_ms >= self.events[-1]
+        else:
+            self.finished = self.next_event >= len(self.events)
+            if not self.finished:
+                self.clock_ms = int(self.events[self.next_event])
+                self.next_event += 1
+
+    def time(self):
+        return self.clock_ms / 1000.0
+
+    def sleep(self, seconds):
+        if self.speed: time.sleep(seconds / self.speed)
+
+    def check_timeframe(self, timeframe):
+        if timeframe != self.timeframe:
+            raise ValueError(f"Replay was recorded on {self.timeframe}, not {timeframe}")
+
+    def copy_rates_from_pos(self, symbol, timeframe, start_pos, count):
+        self.check_timeframe(timeframe)
+        rates = self.rates.get(symbol)
+        if rates is None: return None
+        end = np.searchsorted(rates['time'], self.clock_ms // 1000, side='right') - start_pos
+        if end <= 0: return None
+        out = rates[max(end - count, 0):end].copy()
+        if start_pos == 0:
+            # Rebuild the forming bar from the ticks seen so far so it doesn't leak the
+            # future; before its first tick it is open-only
+            bar = out[-1]
+            ticks = self.ticks[symbol]
+            lo, hi = np.searchsorted(ticks['time_msc'], [int(bar['time']) * 1000, self.clock_ms + 1])
+            bar['high'] = bar['low'] = bar['close'] = bar['open']
+            if hi > lo:
+                bids = ticks['bid'][lo:hi]
+                bar['high'] = max(bar['open'], bids.max())
+                bar['low'] = min(bar['open'], bids.min())
+                bar['close'] = bids[-1]
+        return out
+
+    def symbol_info_tick(self, symbol):
+        ticks = self.ticks.get(symbol)
+        if ticks is None: return None
+        k = np.searchsorted(ticks['time_msc'], self.clock_ms, side='right') - 1
+        if k < 0: return None
+        t = ticks[k]
+        return SimpleNamespace(time=int(t['time_msc']) // 1000, time_msc=int(t['time_msc']), bid=float(t['bid']),
+                               ask=float(t['ask']), last=0.0, volume=0, flags=0, volume_real=0.0)
+
+    def symbol_info(self, symbol):
+        spec = self.specs.get(symbol)
+        return SimpleNamespace(name=symbol, **spec) if spec else None
+
+    def account_info(self):
+        return SimpleNamespace(**self.account)
+
+    def symbols_get(self):
+        return [SimpleNamespace(name=s, path=spec.get("path", s), visible=True) for s, spec in self.specs.items()]
+
+class BarCache:
+    # Fixed-size ring buffer holding one symbol's most recent bars (MT5 rates dtype).
+    # The newest slot is the still-forming bar and gets patched in place on every update.
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.buf = None
+        self.head = 0   # slot of the oldest bar
+        self.count = 0
+
+    @property
+    def last_time(self):
+        if not self.count: return 0
+        return int(self.buf['time'][(self.head + self.count - 1) % self.capacity])
+
+    def load(self, rates):
+        rates = rates[-self.capacity:]
+        if self.buf is None or self.buf.dtype != rates.dtype:
+            self.buf = np.zeros(self.capacity, dtype=rates.dtype)
+        self.buf[:len(rates)] = rates
+        self.head = 0
+        self.count = len(rates)
+
+    def merge(self, rates):
+        # Returns how many bars were appended (0 = only the forming bar changed)
+        if self.buf is None: self.load(rates); return len(rates)
+        last = self.last_time
+        newer = rates[rates['time'] >= last]
+        added = 0
+        for bar in newer:
+            if bar['time'] == last:
+                self.buf[(self.head + self.count - 1) % self.capacity] = bar
+                continue
+            if self.count < self.capacity:
+                self.buf[(self.head + self.count) % self.capacity] = bar
+                self.count += 1
+            else:
+                self.buf[self.head] = bar
+                self.head = (self.head + 1) % self.capacity
+            last = int(bar['time'])
+            added += 1
+        return added
+
+    @property
+    def first_time(self):
+        return int(self.buf['time'][self.head]) if self.count else 0
+
+    def since(self, t):
+        # Bars strictly newer than t, oldest first
+        n = 0
+        while n < self.count and self.buf['time'][(self.head + self.count - 1 - n) % self.capacity] > t:
+            n += 1
+        return self.tail(n)
+
+    def tail(self, n):
+        n = min(n, self.count)
+        idx = (self.head + self.count - n + np.arange(n)) % self.capacity
+        return self.buf[idx]
+
+    def view(self):
+        return self.tail(self.count)
+
+BAR_FIELDS = [('time', '<i8'), ('open', '<f8'), ('high', '<f8'), ('low', '<f8'), ('close', '<f8'),
+              ('tick_volume', '<u8'), ('spread', '<i4'), ('real_volume', '<u8')]  # MT5 rates layout
+
+class BarStore:
+    # Closed bars persisted between runs: one headerless, append-only file of MT5 rates
+    # records per symbol under BAR_STORE/<server>/<timeframe>/. Startup memory-maps the
+    # tail of each file, so only bars that closed while the scanner was down are
+    # downloaded. Files are only touched from the fetch stage, one symbol per thread.
+    def __init__(self, root):
+        self.root = root
+        self.dtype = np.dtype(BAR_FIELDS)
+        self.last = {}    # symbol -> time of its newest stored bar
+        os.makedirs(root, exist_ok=True)
+
+    @staticmethod
+    def safe(name):
+        return "".join(c if c.isalnum() or c in "._-#" else "_" for c in name)
+
+    def path(self, symbol):
+        return os.path.join(self.root, self.safe(symbol) + ".bars")
+
+    def read(self, symbol, count):
+        # Newest `count` stored bars, or None
+        path = self.path(symbol)
+        try: size = os.path.getsize(path)
+        except OSError: return None
+        n, torn = divmod(size, self.dtype.itemsize)
+        if torn: os.truncate(path, n * self.dtype.itemsize)  # half-written record from a crash
+        if not n: return None
+        out = np.array(np.memmap(path, dtype=self.dtype, mode="r", shape=(n,))[-count:])
+        self.last[symbol] = int(out['time'][-1])
+        return out
+
+    def write(self, symbol, closed):
+        # Appends the closed bars newer than what is stored. When they don't connect to
+        # the stored ones (down for longer than a top-up reaches) the file starts over.
+        if not len(closed): return
+        last = self.last.get(symbol)
+        mode = "ab" if last is not None and last >= closed['time'][0] else "wb"
+        if mode == "ab": closed = closed[closed['time'] > last]
+        if not len(closed): return
+        with open(self.path(symbol), mode) as f:
+            f.write(np.ascontiguousarray(closed).astype(self.dtype, copy=False).tobytes())
+        self.last[symbol] = int(closed['time'][-1])
+
+# ------------------------------------------
+# Streaming indicators
+# Every indicator keeps running state and is advanced once per closed bar (update),
+# so a new bar costs O(1) regardless of history length; ticks inside a bar only
+# feed the tick stage of the scoring. The recursions reproduce pandas_ta's formulas step for step
+# (EMA seeded with an SMA, everything else on its pandas ewm based RMA).
+# ------------------------------------------
+NAN = float('nan')
+
+class EWM:
+    # One-observation-at-a-time equivalent of Series.ewm(alpha=..., adjust=...).mean()
+    def __init__(self, alpha, adjust=True, min_periods=0):
+        self.decay = 1.0 - alpha
+        self.new_wt = 1.0 if adjust else alpha
+        self.adjust = adjust
+        self.min_periods = max(min_periods, 1)
+        self.avg = NAN
+        self.old_wt = 1.0
+        self.nobs = 0
+
+    def update(self, x):
+        avg, old_wt, nobs = self.avg, self.old_wt, self.nobs
+        is_obs = x == x
+        nobs += is_obs
+        if avg == avg:
+            old_wt *= self.decay
+            if is_obs:
+                if avg != x: avg = ((old_wt * avg) + (self.new_wt * x)) / (old_wt + self.new_wt)
+                old_wt = old_wt + self.new_wt if self.adjust else 1.0
+        elif is_obs:
+            avg = x
+        self.avg, self.old_wt, self.nobs = avg, old_wt, nobs
+        return avg if nobs >= self.min_periods else NAN
+
+def RMA(length):
+    # pandas_ta rma: Wilder smoothing expressed as an adjusted ewm
+    return EWM(1.0 / length, adjust=True, min_periods=length)
+
+class SeededEMA:
+    # pandas_ta ema (sma=True): SMA of the first `length` values, then a plain EMA
+    def __init__(self, length):
+        self.length = length
+        self.seed = []
+        self.ewm = EWM(2.0 / (length + 1), adjust=False)
+
+    def update(self, x):
+        if self.seed is None: return self.ewm.update(x)
+        v = (sum(self.seed) + x) / self.length if len(self.seed) + 1 >= self.length else NAN
+        self.seed.append(x)
+        if v == v:
+            self.seed = None
+            return self.ewm.update(v)
+        return NAN
+
+class RollingMax:
+    # Max over the last `length` values via a monotonic deque (use -x for a rolling min)
+    def __init__(self, length):
+        self.length = length
+        self.n = 0
+        self.window = deque()  # (index, value), values strictly decreasing
+
+    def push(self, x):
+        while self.window and self.window[-1][1] <= x: self.window.pop()
+        self.window.append((self.n, x))
+        self.n += 1
+        if self.window[0][0] <= self.n - 1 - self.length: self.window.popleft()
+        return self.window[0][1] if self.n >= self.length else NAN
+
+class IndicatorEngine:
+    # Per-symbol EMA / ATR / RSI / ADX / Donchian state advanced one closed bar at a time
+    def __init__(self):
+        cfg = PropGuardConfig
+        self.ema = SeededEMA(cfg.EMA_PERIOD)
+        self.atr = RMA(cfg.ATR_PERIOD)
+        self.rsi_up, self.rsi_dn = RMA(cfg.RSI_PERIOD), RMA(cfg.RSI_PERIOD)
+        self.adx_atr = RMA(cfg.ADX_PERIOD)
+        self.dm_pos, self.dm_neg = RMA(cfg.ADX_PERIOD), RMA(cfg.ADX_PERIOD)
+        self.adx = RMA(cfg.ADX_PERIOD)
+        self.dc_upper, self.dc_lower = RollingMax(cfg.LOOKBACK), RollingMax(cfg.LOOKBACK)
+        self.prev = None     # (high, low, close) of the last committed bar
+        self.last_time = 0   # open time of the last committed bar
+        self.values = {}     # indicator values at the last committed bar
+
+    def update(self, bar):
+        h, l, c = float(bar['high']), float(bar['low']), float(bar['close'])
+        if self.prev is None:
+            tr = diff = dm_p = dm_n = NAN
+        else:
+            ph, pl, pc = self.prev
+            tr = max(h - l, abs(h - pc), abs(pc - l))
+            diff = c - pc
+            up, dn = h - ph, pl - l
+            dm_p = up if (up > dn and up > 0) else 0.0
+            dm_n = dn if (dn > up and dn > 0) else 0.0
+
+        up_avg = self.rsi_up.update(max(diff, 0.0) if diff == diff else NAN)
+        dn_avg = self.rsi_dn.update(min(diff, 0.0) if diff == diff else NAN)
+        rsi_den = up_avg + abs(dn_avg)
+        rsi = 100.0 * up_avg / rsi_den if rsi_den else NAN
+
+        adx_atr = self.adx_atr.update(tr)
+        k = 100.0 / adx_atr if adx_atr else NAN
+        dmp = k * self.dm_pos.update(dm_p)
+        dmn = k * self.dm_neg.update(dm_n)
+        dx = 100.0 * abs(dmp - dmn) / (dmp + dmn) if (dmp + dmn) else NAN
+
+        values = {
+            "close": c,
+            "ema": self.ema.update(c),
+            "atr": self.atr.update(tr),
+            "rsi": rsi,
+            "adx": self.adx.update(dx),
+            "dcu": self.dc_upper.push(h),
+            "dcl": -self.dc_lower.push(-l),
+        }
+        self.prev = (h, l, c)
+        self.last_time = int(bar['time'])
+        self.values = values
+        return values
+
+# ------------------------------------------
+# Cross-sectional scoring
+# Vectorized over struct-of-arrays inputs (one element per symbol) and split in two:
+# trend, momentum and volatility only move when a bar closes, while structure,
+# liquidity, entry, SL/TP and lot size follow the live tick.
+# ------------------------------------------
+BAR_STAGE_INPUTS = ("close", "ema", "atr", "rsi", "adx")
+TICK_STAGE_INPUTS = ("bias", "static", "atr", "dcu", "dcl", "bid", "ask", "point")
+SIZING_INPUTS = ("point", "tick_value", "volume_step", "volume_min", "volume_max")
+BIAS_NAMES = ("BEARISH", "NEUTRAL", "BULLISH")  # indexed by bias + 1
+
+def static_score(trend, mom, vol, weights):
+    return (weights["trend"] * trend) + (weights["mom"] * mom) + (weights["vol"] * vol)
+
+def final_score(static, struct, liq, weights):
+    return np.round(100 * ((static + (weights["struct"] * struct)) + (weights["liq"] * liq)), 1)
+
+def load_score_weights(path, timeframe=None):
+    # The "live" fit of a walkforward.py schedule: {"weights": {...}, "trade_score": x, ...}.
+    # Refused when it was fitted under other indicator settings or another timeframe.
+    with open(path) as f: doc = json.load(f)
+    changed = [f"{k}={v} (config: {getattr(PropGuardConfig, k, None)})" for k, v in (doc.get("params") or {}).items()
+               if getattr(PropGuardConfig, k, None) != v]
+    if timeframe and doc.get("timeframe", timeframe) != timeframe:
+        changed.append(f"timeframe {doc['timeframe']} (scanning {timeframe})")
+    if changed: raise ValueError("fitted with " + ", ".join(changed))
+    live = doc.get("live") or doc["schedule"][-1]
+    weights = {k: float(live["weights"][k]) for k in PropGuardConfig.SCORE_WEIGHTS}
+    if min(weights.values()) < 0 or abs(sum(weights.values()) - 1.0) > 1e-3:
+        raise ValueError(f"weights must be >= 0 and sum to 1, got {weights}")
+    return dict(live, weights=weights)
+
+def score_bar_stage(close, ema, atr, rsi, adx, weights=None):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        bias = np.where(close > ema, 1, np.where(close < ema, -1, 0)).astype(np.int8)
+
+        trend_str = np.minimum(np.abs(close - ema) / (atr * 2.0), 1.0)
+        adx_norm = np.clip((adx - 20) / 25, 0, 1)
+        score_trend = (0.6 * trend_str) + (0.4 * adx_norm)
+
+        score_mom = np.where(bias == 1, np.clip((rsi - 50) / 25, 0, 1),
+                             np.where(bias == -1, np.clip((50 - rsi) / 25, 0, 1), 0.0))
+
+        atr_pct = atr / close
+        score_vol = np.clip((atr_pct - 0.0005) / 0.002, 0, 1)
+
+        static = static_score(score_trend, score_mom, score_vol, weights or PropGuardConfig.SCORE_WEIGHTS)
+
+    return {"bias": bias, "trend_str": trend_str, "trend": score_trend, "mom": score_mom,
+            "vol": score_vol, "static": static}
+
+def score_tick_stage(bias, static, atr, dcu, dcl, bid, ask, point, rr_ratio, weights=None, atr_multiplier=None):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        bull = bias == 1
+
+        dist_to_break = np.where(bull, np.abs(dcu - ask), np.abs(bid - dcl))
+        score_struct = 1.0 - np.minimum(dist_to_break / (atr * 1.5), 1.0)
+
+        spread_points = (ask - bid) / point
+        atr_points = atr / point
+        score_liq = np.maximum(1.0 - (spread_points / (atr_points * 0.2)), 0.0)
+
+        score = final_score(static, score_struct, score_liq, weights or PropGuardConfig.SCORE_WEIGHTS)
+
+        # NEUTRAL is priced like a short, as it always has been
+        entry = np.where(bull, ask, bid)
+        stop = atr * (atr_multiplier or PropGuardConfig.ATR_MULTIPLIER)
+        sl = np.where(bull, entry - stop, entry + stop)
+        tp = np.where(bull, entry + ((entry - sl) * rr_ratio), entry - ((sl - entry) * rr_ratio))
+
+    return {"score": score, "entry": entry, "sl": sl, "tp": tp,
+            "spread": spread_points, "struct": score_struct, "liq": score_liq}
+
+def size_positions(entry, sl, point, tick_value, volume_step, volume_min, volume_max, balance, risk_pct):
+    # Lot size risking risk_pct of balance at the stop, on each symbol's volume grid
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sl_points = np.abs(entry - sl) / point
+        risk_money = balance * (risk_pct / 100.0)
+        raw_lot = risk_money / (sl_points * tick_value)
+        lot = np.round(raw_lot / volume_step) * volume_step
+        lot = np.where(lot <= volume_max, np.maximum(lot, volume_min), volume_max)
+        lot = np.where((tick_value == 0) | (sl_points == 0), 0.0, lot)
+    return lot
+
+# ------------------------------------------
+# Symbol universe
+# The broker's symbol list is read once per session. A category is expanded to
+# every symbol whose path matches its masks, and the canonical names in ASSETS
+# are mapped onto the broker's own spelling (EURUSD -> EURUSD.r) once and cached.
+# ------------------------------------------
+class SymbolUniverse:
+    def __init__(self, fetch, suffix_max=PropGuardConfig.SYMBOL_SUFFIX_MAX):
+        self.fetch = fetch          # () -> iterable of symbol_info-like objects
+        self.suffix_max = suffix_max
+        self.infos = None           # broker name -> symbol info
+        self.keys = None            # broker name -> upper case, punctuation stripped
+        self.resolved = {}          # requested name -> broker name (None = not offered)
+
+    @staticmethod
+    def key(name):
+        return "".join(c for c in name.upper() if c.isalnum())
+
+    def load(self):
+        if self.infos is None:
+            self.infos = {s.name: s for s in (self.fetch() or ())}
+            self.keys = {name: self.key(name) for name in self.infos}
+        return self.infos
+
+    @staticmethod
+    def matcher(masks):
+        include = [m.upper() for m in masks if not m.startswith("!")]
+        exclude = [m[1:].upper() for m in masks if m.startswith("!")]
+        return lambda path: (any(fnmatchcase(path, m) for m in include)
+                             and not any(fnmatchcase(path, m) for m in exclude))
+
+    def paths(self):
+        return ((name, (getattr(info, "path", "") or name).upper()) for name, info in self.load().items())
+
+    def group(self, masks):
+        match = self.matcher(masks)
+        return [name for name, path in self.paths() if match(path)]
+
+    def categorize(self, groups=PropGuardConfig.UNIVERSE_GROUPS, other="OTHER"):
+        # Every broker symbol under the first category whose masks match its path
+        matchers = [(cat, self.matcher(masks)) for cat, masks in groups.items()]
+        out = {cat: [] for cat in groups}
+        for name, path in self.paths():
+            cat = next((c for c, match in matchers if match(path)), other)
+            out.setdefault(cat, []).append(name)
+        return {cat: names for cat, names in out.items() if names}
+
+    def resolve(self, symbol):
+        if symbol not in self.resolved: self.resolved[symbol] = self.match(symbol)
+        return self.resolved[symbol]
+
+    def match(self, symbol):
+        if symbol in self.load(): return symbol
+        want = self.key(symbol)
+        best = None
+        for name, key in self.keys.items():
+            extra = key[len(want):]
+            if not key.startswith(want) or len(extra) > self.suffix_max: continue
+            if extra[:1].isdigit() and want[-1:].isdigit(): continue  # US30 is not US3000
+            rank = (len(extra), len(name), name)
+            if best is None or rank < best[0]: best = (rank, name)
+        return best[1] if best else None
+
+# ------------------------------------------
+# Contract specifications
+# symbol_info is effectively static within a session, so it is loaded once and
+# shared by scoring and lot sizing. Only the tick value of instruments quoted in
+# a currency other than the account's drifts with FX rates; it gets its own,
+# faster refresh.
+# ------------------------------------------
+class ContractSpec:
+    FIELDS = ("point", "digits", "trade_tick_value", "trade_tick_size", "volume_step",
+              "volume_min", "volume_max", "trade_mode", "currency_profit")
+
+    def __init__(self, info, now):
+        for f in self.FIELDS: setattr(self, f, getattr(info, f))
+        self.loaded_at = self.tick_value_at = now
+
+class ContractSpecCache:
+    def __init__(self, fetch, ttl=PropGuardConfig.SPEC_TTL, tick_value_ttl=PropGuardConfig.TICK_VALUE_TTL):
+        self.fetch = fetch          # symbol -> symbol_info-like object (or None)
+        self.ttl = ttl
+        self.tick_value_ttl = tick_value_ttl
+        self.account_currency = None
+        self.specs = {}
+
+    def is_cross(self, spec):
+        return self.account_currency is not None and spec.currency_profit != self.account_currency
+
+    def get(self, symbol):
+        now = time.monotonic()
+        spec = self.specs.get(symbol)
+        if spec is None or now - spec.loaded_at > self.ttl:
+            info = self.fetch(symbol)
+            if not info: return None
+            spec = self.specs[symbol] = ContractSpec(info, now)
+        elif self.is_cross(spec) and now - spec.tick_value_at > self.tick_value_ttl:
+            info = self.fetch(symbol)
+            if info: spec.trade_tick_value = info.trade_tick_value
+            spec.tick_value_at = now
+        return spec
+
+    def invalidate(self, symbol=None):
+        if symbol is None: self.specs.clear()
+        else: self.specs.pop(symbol, None)
+
+class AccountSnapshot:
+    # Captured once at the top of a cycle so every row is sized against the same balance
+    def __init__(self, balance, equity, currency):
+        self.balance = balance
+        self.equity = equity
+        self.currency = currency
+
+    @classmethod
+    def capture(cls, fetch):
+        acct = fetch()
+        if not acct: return None
+        return cls(acct.balance, acct.equity, acct.currency)
+
+class CycleScheduler:
+    # Paces the run loop. Light cycles run on a fixed TICK_INTERVAL grid, so a slow
+    # cycle shortens the following wait instead of pushing every later cycle back. The
+    # grid is kept on the wall clock, since a replay's clock only moves in advance()
+    # and would not see the cycle's own run time; intervals and sleeps stay in source
+    # seconds (clock_rate converts). On top of that the loop is woken right after
+    # each broker-time bar boundary so new bars are scored the moment they open.
+    # Broker time is learned from tick timestamps (the terminal has no clock call).
+    def __init__(self, source, bar_seconds, tick_interval=PropGuardConfig.TICK_INTERVAL,
+                 close_grace=PropGuardConfig.BAR_CLOSE_GRACE):
+        self.source = source
+        self.bar_seconds = bar_seconds
+        self.tick_interval = tick_interval
+        self.close_grace = close_grace
+        self.offsets = deque(maxlen=60)  # per-cycle estimates of broker time - source time
+        self.next_tick = None
+
+    def observe(self, broker_time):
+        # Ticks only ever lag the server clock, so the freshest one is the best estimate
+        if broker_time: self.offsets.append(broker_time - self.source.time())
+
+    def broker_time(self):
+        return self.source.time() + max(self.offsets) if self.offsets else None
+
+    def next_bar_close(self, now):
+        offset = max(self.offsets) if self.offsets else 0.0
+        broker_now = now + offset
+        return (broker_now // self.bar_seconds + 1) * self.bar_seconds - offset + self.close_grace
+
+    def wait(self):
+        rate = self.source.clock_rate
+        now, interval = time.monotonic(), self.tick_interval / rate
+        if self.next_tick is None: self.next_tick = now
+        self.next_tick += interval
+        if self.next_tick < now:
+            # Overran by more than a whole interval: rejoin the grid instead of bursting
+            self.next_tick = now + interval - (now - self.next_tick) % interval
+        source_now = self.source.time()
+        wake = min(self.next_tick, now + (self.next_bar_close(source_now) - source_now) / rate)
+        if wake > now: self.source.sleep((wake - now) * rate)
+
+class SnapshotSlot:
+    # Single-slot, latest-wins handoff from the engine to a consumer. The engine never
+    # blocks or queues; a consumer polling slower than the engine publishes simply
+    # skips the snapshots it missed (counted in `dropped`).
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.value = None
+        self.version = 0
+        self.seen = 0
+        self.dropped = 0
+
+    def publish(self, value):
+        with self.lock:
+            self.value = value
+            self.version += 1
+
+    def take(self):
+        with self.lock:
+            if self.version == self.seen: return None
+            self.dropped += self.version - self.seen - 1
+            self.seen = self.version
+            return self.value
+
+class LogBuffer:
+    # Ring buffer between whoever logs and the log pane. push() is a deque append plus,
+    # when LOG_FILE is set, a queue put; the rotating file is written by a listener
+    # thread, so logging never waits on the GUI or the disk.
+    def __init__(self, max_lines=PropGuardConfig.LOG_MAX_LINES, file_path=PropGuardConfig.LOG_FILE):
+        self.lines = deque(maxlen=max_lines)
+        self.file_queue = self.listener = None
+        if file_path:
+            handler = RotatingFileHandler(file_path, maxBytes=PropGuardConfig.LOG_FILE_MAX_BYTES,
+                                          backupCount=PropGuardConfig.LOG_FILE_BACKUPS, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            self.file_queue = queue.SimpleQueue()
+            self.listener = QueueListener(self.file_queue, handler)
+            self.listener.start()
+
+    def push(self, msg, color):
+        self.lines.append((datetime.now().strftime("%H:%M:%S"), msg, color))
+        if self.file_queue: self.file_queue.put(logging.makeLogRecord({"msg": msg}))
+
+    def drain(self):
+        out = []
+        while True:
+            try: out.append(self.lines.popleft())
+            except IndexError: return out
+
+    def close(self):
+        if self.listener: self.listener.stop()
+
+def prefilter_reason(tick, spec, atr, broker_now):
+    # First funnel stage: only tick and contract data (plus the last known ATR, if any).
+    # Returns why the symbol cannot score right now, or None to let it through.
+    cfg = PropGuardConfig
+    if spec.trade_mode in cfg.PREFILTER_BLOCKED_TRADE_MODES: return "trade disabled"
+    if broker_now is not None and broker_now - tick.time > cfg.PREFILTER_MAX_TICK_AGE: return "market closed"
+    if atr and atr == atr and (tick.ask - tick.bid) >= cfg.PREFILTER_MAX_SPREAD_ATR * atr: return "spread"
+    return None
+
+# ------------------------------------------
+# Signal outcomes
+# A row whose score crosses SIGNAL_BANDS[0] opens a signal at the live tick (at most
+# one per symbol per bar). Until its bar closes, the polled ticks after the signal are
+# checked against SL/TP; from then on each closed bar is, with backtest.py's rules: a
+# bar touching both levels is a stop, and SIGNAL_HORIZON bars without either close at
+# market. Each new bar only advances the signals still open; the journal is replayed
+# on startup instead of rescanning history.
+# ------------------------------------------
+class JournalWriter:
+    # Appends JSON lines from a background thread. put() is a queue put; events that
+    # arrive within SIGNAL_FLUSH_EVERY of each other go to disk in one write.
+    def __init__(self, path, flush_every=PropGuardConfig.SIGNAL_FLUSH_EVERY):
+        self.path = path
+        self.flush_every = flush_every
+        self.queue = queue.SimpleQueue()
+        self.error = None
+        self.thread = threading.Thread(target=self._run, name="signal-journal", daemon=True)
+        self.thread.start()
+
+    def put(self, event):
+        self.queue.put(event)
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + self.flush_every
+            while batch[-1] is not None:
+                try: batch.append(self.queue.get(timeout=max(deadline - time.monotonic(), 0)))
+                except queue.Empty: break
+            lines = "".join(json.dumps(e) + "\n" for e in batch if e is not None)
+            if lines and self.error is None:
+                try:
+                    with open(self.path, "a", encoding="utf-8") as f: f.write(lines)
+                except OSError as e:
+                    self.error = e
+            if batch[-1] is None: return
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+
+class SignalTracker:
+    # Lives on the engine thread: observe() after scoring, label() when bars close,
+    # tick() with each new tick of a symbol
+    def __init__(self, bar_seconds, journal=None, bands=PropGuardConfig.SIGNAL_BANDS,
+                 horizon=PropGuardConfig.SIGNAL_HORIZON):
+        self.bar_seconds = bar_seconds
+        self.bands = bands
+        self.horizon = horizon
+        self.open = {}         # symbol -> open signals, oldest first
+        self.above = set()     # symbols scoring >= SIGNAL_BANDS[0] since their last crossing
+        self.last_bar = {}     # symbol -> bar of its newest signal
+        self.stats = [{"open": 0, "wins": 0, "losses": 0, "timeouts": 0, "total_r": 0.0} for _ in bands[:-1]]
+        self.loaded = 0
+        self.writer = None
+        if journal:
+            self.load(journal)
+            self.writer = JournalWriter(journal)
+
+    def band(self, score):
+        i = bisect_right(self.bands, score) - 1
+        return self.stats[i] if 0 <= i < len(self.stats) else None
+
+    def load(self, path):
+        # Closed signals only feed the counters; open ones resume labelling. A symbol
+        # still above the threshold at shutdown stays so (a dip while down is missed).
+        # Ticks seen before a restart are gone, so a resumed signal skips its own bar.
+        try: f = open(path, encoding="utf-8")
+        except OSError: return
+        signals, torn = {}, False
+        with f:
+            for line in f:
+                torn = not line.endswith("\n")
+                try: event = json.loads(line)
+                except ValueError: continue   # half-written line from a crash
+                if event.get("type") == "signal":
+                    signals[event["id"]] = event
+                    self.above.add(event["symbol"])
+                elif event.get("type") == "above": self.above.add(event["symbol"])
+                elif event.get("type") == "below": self.above.discard(event["symbol"])
+                elif event.get("type") == "outcome" and event.get("id") in signals:
+                    self.count(signals.pop(event["id"])["score"], event["outcome"], event["r"])
+                self.loaded += 1
+        if torn:
+            with open(path, "a", encoding="utf-8") as f: f.write("\n")
+        for sig in signals.values(): self.track(sig)
+
+    def track(self, sig):
+        self.open.setdefault(sig["symbol"], []).append(dict(sig, checked=sig["bar"], bars=0))
+        self.last_bar[sig["symbol"]] = max(self.last_bar.get(sig["symbol"], 0), sig["bar"])
+        band = self.band(sig["score"])
+        if band: band["open"] += 1
+
+    def count(self, score, outcome, r):
+        band = self.band(score)
+        if band is None: return
+        band[{"TP": "wins", "SL": "losses"}.get(outcome, "timeouts")] += 1
+        band["total_r"] += r
+
+    def observe(self, row, broker_time, point):
+        # Opens a signal when the row's score crossed the threshold; returns it, or None
+        symbol, score = row["symbol"], row["score"]
+        if score < self.bands[0]:
+            if symbol in self.above:
+                self.above.discard(symbol)
+                if self.writer: self.writer.put({"type": "below", "symbol": symbol, "time": broker_time})
+            return None
+        if symbol in self.above: return None
+        self.above.add(symbol)
+        bar = broker_time - broker_time % self.bar_seconds
+        risk = abs(row["price"] - row["sl"])
+        if self.last_bar.get(symbol) == bar or not risk > 0:
+            # A crossing without a signal still has to survive a restart
+            if self.writer: self.writer.put({"type": "above", "symbol": symbol, "time": broker_time})
+            return None
+        sig = {"type": "signal", "id": f"{symbol}@{broker_time}", "symbol": symbol, "time": broker_time, "bar": bar,
+               "score": score, "bias": row["bias"], "entry": row["price"], "sl": row["sl"], "tp": row["tp"],
+               "point": point, "components": row.get("components")}
+        self.track(sig)
+        if self.writer: self.writer.put(sig)
+        return sig
+
+    def label(self, symbol, cache):
+        # Advances the symbol's open signals over the bars closed since they were last
+        # checked (the newest cache slot is the forming bar); returns the finished ones
+        pending = self.open.get(symbol)
+        if not pending: return []
+        closed = cache.since(min(s["checked"] for s in pending))[:-1]
+        finished = []
+        for sig in pending:
+            long, entry, sl, tp = sig["bias"] == "BULLISH", sig["entry"], sig["sl"], sig["tp"]
+            risk = abs(entry - sl)
+            for bar in closed[closed['time'] > sig["checked"]]:
+                sig["checked"] = int(bar['time'])
+                sig["bars"] += 1
+                spread = bar['spread'] * sig["point"]
+                if long: stop, take = bar['low'] <= sl, bar['high'] >= tp
+                else: stop, take = bar['high'] + spread >= sl, bar['low'] + spread <= tp
+                if stop: outcome, r = "SL", -1.0
+                elif take: outcome, r = "TP", abs(tp - entry) / risk
+                elif sig["bars"] >= self.horizon:
+                    exit_px = bar['close'] if long else bar['close'] + spread
+                    outcome, r = "TIMEOUT", float((exit_px - entry if long else entry - exit_px) / risk)
+                else: continue
+                finished.append(self.outcome(sig, outcome, r, sig["checked"]))
+                break
+        return self.finish(symbol, finished)
+
+    def tick(self, symbol, tick):
+        # Checks the signals still inside their own bar against a polled tick: longs
+        # exit on the bid, shorts on the ask. Touches between polls are not seen.
+        pending = self.open.get(symbol)
+        if not pending: return []
+        finished = []
+        for sig in pending:
+            if sig["bars"] or tick.time <= sig["time"] or tick.time - sig["bar"] >= self.bar_seconds: continue
+            long, entry, sl, tp = sig["bias"] == "BULLISH", sig["entry"], sig["sl"], sig["tp"]
+            px = tick.bid if long else tick.ask
+            if (px <= sl) if long else (px >= sl): outcome, r = "SL", -1.0
+            elif (px >= tp) if long else (px <= tp): outcome, r = "TP", abs(tp - entry) / abs(entry - sl)
+            else: continue
+            finished.append(self.outcome(sig, outcome, r, int(tick.time)))
+        return self.finish(symbol, finished)
+
+    def outcome(self, sig, outcome, r, exit_time):
+        return {"type": "outcome", "id": sig["id"], "symbol": sig["symbol"], "outcome": outcome, "r": r,
+                "exit_time": exit_time, "bars": sig["bars"]}
+
+    def finish(self, symbol, finished):
+        if finished:
+            done = {e["id"] for e in finished}
+            pending = self.open[symbol]
+            self.open[symbol] = [s for s in pending if s["id"] not in done]
+            for sig, event in zip([s for s in pending if s["id"] in done], finished):
+                band = self.band(sig["score"])
+                if band: band["open"] -= 1
+                self.count(sig["score"], event["outcome"], event["r"])
+                if self.writer: self.writer.put(event)
+        return finished
+
+    def report(self):
+        # Live hit rate and expectancy per score band, in bucket_report()'s layout
+        out = []
+        for lo, hi, s in zip(self.bands[:-1], self.bands[1:], self.stats):
+            n = s["wins"] + s["losses"] + s["timeouts"]
+            out.append({"band": f"{lo:g}-{min(hi, 100):g}", "trades": n, "open": s["open"], "wins": s["wins"],
+                        "losses": s["losses"], "timeouts": s["timeouts"], "hit_rate": s["wins"] / n if n else None,
+                        "expectancy_r": s["total_r"] / n if n else None, "total_r": s["total_r"]})
+        return out
+
+    def close(self):
+        if self.writer: self.writer.close()
+
+# ------------------------------------------
+# Latency instrumentation
+# Every stage of a cycle records its duration into a log-bucketed histogram:
+# O(1) per sample, fixed memory, percentiles good to one bucket (~12%).
+# Per-symbol stages get one sample per symbol, the rest one per cycle.
+# ------------------------------------------
+class LatencyHistogram:
+    BUCKETS_PER_DECADE = 20
+    FLOOR = 1e-6             # seconds; bucket 0 holds everything faster
+
+    def __init__(self, decades=9):
+        self.counts = [0] * (decades * self.BUCKETS_PER_DECADE + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        i = 0
+        if seconds > self.FLOOR:
+            i = min(int(math.log10(seconds / self.FLOOR) * self.BUCKETS_PER_DECADE) + 1, len(self.counts) - 1)
+        self.counts[i] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max: self.max = seconds
+
+    def percentile(self, q):
+        # Upper edge of the bucket holding the q-th percentile sample, capped at the max seen
+        if not self.count: return 0.0
+        rank, seen = q / 100.0 * self.count, 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if c and seen >= rank: return min(self.FLOOR * 10 ** (i / self.BUCKETS_PER_DECADE), self.max)
+        return self.max
+
+    def summary(self):
+        ms = 1000.0
+        return {"count": self.count, "mean_ms": self.total / self.count * ms if self.count else 0.0,
+                "p50_ms": self.percentile(50) * ms, "p95_ms": self.percentile(95) * ms,
+                "p99_ms": self.percentile(99) * ms, "max_ms": self.max * ms}
+
+class LatencyStats:
+    # Stage name -> histogram. Stages are recorded from the engine, the fetch pool
+    # and the GUI thread, so updates and reads go through one lock.
+    STAGES = ("fetch/symbol", "indicators/symbol", "fetch/cycle", "scoring/cycle",
+              "sizing/cycle", "emit/cycle", "cycle", "render/frame")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.stages = {name: LatencyHistogram() for name in self.STAGES}
+            self.symbol_ms = {}     # symbol -> its last fetch + indicator time, in ms
+            self.started = time.time()
+
+    def record(self, stage, seconds):
+        with self.lock:
+            hist = self.stages.get(stage)
+            if hist is None: hist = self.stages[stage] = LatencyHistogram()
+            hist.record(seconds)
+
+    def record_symbol(self, symbol, fetch, indicators=None):
+        with self.lock:
+            self.stages["fetch/symbol"].record(fetch)
+            if indicators is not None: self.stages["indicators/symbol"].record(indicators)
+            self.symbol_ms[symbol] = (fetch + (indicators or 0.0)) * 1000.0
+
+    @contextmanager
+    def time(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def snapshot(self, slowest=10):
+        with self.lock:
+            stages = {name: h.summary() for name, h in self.stages.items()}
+            worst = sorted(self.symbol_ms.items(), key=lambda kv: kv[1], reverse=True)[:slowest]
+        return {"since": self.started, "taken": time.time(), "stages": stages,
+                "slowest_symbols": [{"symbol": s, "ms": ms} for s, ms in worst]}
+
+    def status_line(self, stages=("cycle", "fetch/symbol", "scoring/cycle", "render/frame")):
+        snap = self.snapshot(0)["stages"]
+        parts = [f"{name} {v['p50_ms']:.1f}/{v['p95_ms']:.1f}/{v['p99_ms']:.1f}"
+                 for name in stages for v in [snap[name]] if v["count"]]
+        return "⏱ p50/p95/p99 ms  " + "  |  ".join(parts) if parts else ""
+
+    def dump(self, path):
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f: json.dump(self.snapshot(), f, indent=1)
+        os.replace(tmp, path)
+
+NO_DATA = object()   # poll_symbol(): no tick, spec or rates for the symbol this cycle
+
+class ScanEngine:
+    # The scanning core. Plain Python: run() loops on the calling thread until stop(),
+    # publishing every ranked snapshot to `snapshots` and to any `consumers` callbacks.
+    def __init__(self, source=None):
+        self.source = source  # None = connect to MT5 when the session starts
+        self.is_running = False
+        self.snapshots = SnapshotSlot()
+        self.logs = LogBuffer()
+        self.consumers = []   # callables receiving each snapshot on the engine thread
+        self.requested_symbols = []  # names as configured (ASSETS spelling)
+        self.groups = []             # UNIVERSE_GROUPS names or raw path masks to scan in full
+        self.universe = None
+        self.active_symbols = []     # broker names actually scanned
+        self.risk_per_trade = 0.5
+        self.rr_ratio = 1.5
+        self.timeframe = PropGuardConfig.TIMEFRAME
+        self.bar_seconds = PropGuardConfig.TIMEFRAME_SECONDS[PropGuardConfig.TIMEFRAME]
+        self.initial_equity = 0.0
+        self.bar_caches = {}
+        self.indicators = {}
+        self.bar_stage = {}
+        self.last_tick = {}   # symbol -> time_msc of the tick behind its current result
+        self.results = {}     # symbol -> last scored row, reused while the market is quiet
+        self.filtered = {}    # symbol -> why the pre-filter kept it out of the last cycle
+        self.specs = None
+        self.sized_balance = None  # balance the cached rows were sized against
+        self.pool = None
+        self.scheduler = None
+        self.store = None
+        self.tracker = None
+        self.latency = LatencyStats()
+        self.latency_dumped = 0.0
+        self.score_weights = dict(PropGuardConfig.SCORE_WEIGHTS)
+        self.trade_score = PropGuardConfig.TRADE_SCORE
+        if PropGuardConfig.SCORE_WEIGHTS_FILE: self.apply_score_weights(PropGuardConfig.SCORE_WEIGHTS_FILE)
+
+    def log(self, msg, color):
+        self.logs.push(msg, color)
+
+    def stop(self):
+        self.is_running = False
+
+    def apply_score_weights(self, path):
+        # This engine's weights and TRADE threshold only; PropGuardConfig is left alone
+        try:
+            live = load_score_weights(path, self.timeframe)
+        except (OSError, ValueError, KeyError, TypeError, IndexError) as e:
+            self.log(f"⚠️ Score weights file {path} not used ({e}), keeping the configured weights", "orange")
+            return False
+        self.score_weights = live["weights"]
+        if live.get("trade_score") is not None: self.trade_score = float(live["trade_score"])
+        weights = " ".join(f"{k}={v:.2f}" for k, v in self.score_weights.items())
+        self.log(f"🎚️ Score weights from {path}: {weights} | TRADE >= {self.trade_score:g}", "cyan")
+        return True
+
+    def set_config(self, symbols, risk, rr, groups=()):
+        self.requested_symbols = list(symbols)
+        self.groups = list(groups)
+        self.risk_per_trade = risk
+        self.rr_ratio = rr
+
+    def build_universe(self):
+        if self.universe is None: self.universe = SymbolUniverse(self.source.symbols_get)
+        symbols = []
+        for requested in self.requested_symbols:
+            name = self.universe.resolve(requested)
+            if name is None: self.log(f"⚠️ {requested}: not offered by this broker", "orange")
+            else: symbols.append(name)
+        for group in self.groups:
+            found = self.universe.group(PropGuardConfig.UNIVERSE_GROUPS.get(group) or group.split(","))
+            self.log(f"🌐 {group}: {len(found)} symbols", "cyan")
+            symbols += found
+        symbols = list(dict.fromkeys(symbols))
+        for s in symbols:
+            if not getattr(self.universe.infos[s], "visible", True): self.source.symbol_select(s)
+
+        self.active_symbols = symbols
+        self.bar_caches = {s: c for s, c in self.bar_caches.items() if s in symbols}
+        self.indicators = {s: i for s, i in self.indicators.items() if s in symbols}
+        self.bar_stage = {s: b for s, b in self.bar_stage.items() if s in symbols}
+        self.last_tick, self.results, self.filtered = {}, {}, {}
+        self.sized_balance = None
+        self.log(f"🧮 Quant Engine Loaded: {len(symbols)} Pairs | Risk: {self.risk_per_trade}%", "cyan")
+
+    def connect(self):
+        with STARTUP.phase("data source init"):
+            try:
+                if self.source is None: self.source = MT5Source()
+            except ImportError:
+                self.log("❌ MetaTrader5 package not installed", "red")
+                return False
+            if not self.source.initialize():
+                self.log(f"❌ {type(self.source).__name__} Init Failed", "red")
+                return False
+            try:
+                self.source.check_timeframe(self.timeframe)
+            except ValueError as e:
+                self.log(f"❌ {e}", "red")
+                self.source.shutdown()
+                return False
+        return True
+
+    def load_universe(self):
+        # Broker symbol list for pickers, loaded (once) before or while scanning
+        if not self.connect(): return None
+        if self.universe is None: self.universe = SymbolUniverse(self.source.symbols_get)
+        self.universe.load()
+        return self.universe
+
+    def start_session(self):
+        if not self.connect(): return False
+        acct = AccountSnapshot.capture(self.source.account_info)
+        self.initial_equity = acct.equity
+        # Specs don't outlive a session: a reconnect may land on another account or server
+        if self.specs is None: self.specs = ContractSpecCache(self.source.symbol_info)
+        else: self.specs.invalidate()
+        self.specs.account_currency = acct.currency
+        self.scheduler = CycleScheduler(self.source, self.bar_seconds)
+        self.open_store()
+        self.open_tracker()
+        self.build_universe()
+        self.latency.reset()
+        return True
+
+    def run(self):
+        if not self.start_session(): return False
+        self.is_running = True
+        self.log("✅ Scanner Started. Analyzing...", "lime")
+        first_ranking = True
+
+        while self.is_running:
+            self.source.advance()
+            if self.source.finished:
+                self.log("⏹ Data source exhausted", "orange")
+                break
+            cycle_start = time.perf_counter()
+            acct = AccountSnapshot.capture(self.source.account_info)
+            if not acct:
+                self.scheduler.wait()
+                continue
+            stats = {
+                "balance": acct.balance,
+                "equity": acct.equity,
+                "daily_pl": acct.equity - self.initial_equity
+            }
+            
+            opportunities = self.scan_cycle(acct)
+            stats["filtered"] = len(self.filtered)
+            stats["signals"] = self.tracker.report()
+            
+            with self.latency.time("emit/cycle"):
+                opportunities.sort(key=lambda x: x['score'], reverse=True)
+                timestamp = datetime.now().strftime("%H:%M:%S")
+                snapshot = {"rows": opportunities, "timestamp": timestamp, "stats": stats}
+                self.snapshots.publish(snapshot)
+                for consumer in self.consumers: consumer(snapshot)
+            self.latency.record("cycle", time.perf_counter() - cycle_start)
+            if first_ranking:
+                first_ranking = False
+                STARTUP.mark("first ranking")
+                for line in STARTUP.report(): self.log(line, "gray")
+            self.dump_latency()
+            if self.tracker.writer and self.tracker.writer.error:
+                self.log(f"⚠️ Signal journal not written: {self.tracker.writer.error}", "orange")
+                self.tracker.writer.close()
+                self.tracker.writer = None
+            
+            if self.last_tick: self.scheduler.observe(max(self.last_tick.values()) / 1000.0)
+            self.scheduler.wait()
+
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+        self.source.shutdown()
+        self.tracker.close()
+        self.dump_latency(force=True)
+        self.log("⛔ Scanner Stopped", "orange")
+        return True
+
+    def dump_latency(self, path=None, force=False):
+        path = path or PropGuardConfig.LATENCY_DUMP
+        if not path: return
+        now = time.monotonic()
+        if not force and now - self.latency_dumped < PropGuardConfig.LATENCY_DUMP_EVERY: return
+        self.latency_dumped = now
+        try:
+            self.latency.dump(path)
+        except OSError as e:
+            self.log(f"⚠️ Latency dump failed: {e}", "orange")
+
+    def open_store(self):
+        self.store = None
+        key = self.source.store_key() if PropGuardConfig.BAR_STORE else None
+        if not key: return
+        try:
+            self.store = BarStore(os.path.join(PropGuardConfig.BAR_STORE, BarStore.safe(key), self.timeframe))
+        except OSError as e:
+            self.log(f"⚠️ Bar store unavailable: {e}", "orange")
+
+    def persist(self, symbol, cache):
+        store = self.store
+        if store is None: return
+        try:
+            store.write(symbol, cache.view()[:-1])
+        except OSError as e:
+            self.store = None
+            self.log(f"⚠️ Bar store disabled: {e}", "orange")
+
+    def open_tracker(self):
+        # Journal per price feed and timeframe, next to the bar store's layout
+        cfg = PropGuardConfig
+        key = self.source.store_key() if cfg.SIGNAL_JOURNAL else None
+        path = None
+        if key:
+            path = os.path.join(cfg.SIGNAL_JOURNAL, BarStore.safe(key), f"{self.timeframe}.jsonl")
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            except OSError as e:
+                self.log(f"⚠️ Signal journal unavailable: {e}", "orange")
+                path = None
+        self.tracker = SignalTracker(self.bar_seconds, path, cfg.SIGNAL_BANDS, cfg.SIGNAL_HORIZON)
+        if self.tracker.loaded:
+            n_open = sum(len(v) for v in self.tracker.open.values())
+            self.log(f"🎯 Signal journal: {self.tracker.loaded} events, {n_open} signals still open", "cyan")
+
+    def fetch_bars(self, symbol):
+        bars = PropGuardConfig.HISTORY_BARS
+        cache = self.bar_caches.get(symbol)
+        if cache is None:
+            stored = self.store.read(symbol, bars - 1) if self.store else None
+            if stored is not None and len(stored) == bars - 1:
+                # Warm start: history from disk, the top-up below fetches what closed since
+                cache = self.bar_caches[symbol] = BarCache(bars)
+                cache.load(stored)
+            else:
+                rates = self.source.copy_rates_from_pos(symbol, self.timeframe, 0, bars)
+                if rates is None or len(rates) < bars: return None
+                cache = self.bar_caches[symbol] = BarCache(bars)
+                cache.load(rates)
+                self.persist(symbol, cache)
+                return cache
+
+        # Top-up: pull just the forming bar plus anything newer than what we hold.
+        # If the terminal was unreachable for a while, widen the request until it
+        # overlaps the cache, falling back to a full reload.
+        count = 2
+        while True:
+            rates = self.source.copy_rates_from_pos(symbol, self.timeframe, 0, count)
+            if rates is None or len(rates) == 0: return cache
+            if rates[0]['time'] <= cache.last_time: break
+            if count >= bars:
+                cache.load(rates)
+                self.persist(symbol, cache)
+                return cache
+            count = min(count * 4, bars)
+        if cache.merge(rates): self.persist(symbol, cache)
+        return cache
+
+    def update_indicators(self, symbol, cache):
+        # Commits newly closed bars; returns True when the closed-bar values moved
+        ind = self.indicators.get(symbol)
+        if ind is None or ind.last_time < cache.first_time:
+            # First sight of the symbol, or the cache was reloaded past our state: warm up
+            ind = self.indicators[symbol] = IndicatorEngine()
+            fresh = cache.view()
+        else:
+            fresh = cache.since(ind.last_time)
+        for bar in fresh[:-1]:
+            ind.update(bar)
+        return len(fresh) > 1
+
+    def refresh_bar_stage(self, symbols):
+        # Bar-close stage: recompute the static components from the last closed bar
+        if not symbols: return
+        vals = [self.indicators[s].values for s in symbols]
+        cols = {k: np.array([v[k] for v in vals], dtype=float) for k in BAR_STAGE_INPUTS}
+        res = score_bar_stage(**cols, weights=self.score_weights)
+        for i, s in enumerate(symbols):
+            v = vals[i]
+            self.bar_stage[s] = {
+                "bias": int(res['bias'][i]), "static": float(res['static'][i]), "trend_str": float(res['trend_str'][i]),
+                "trend": float(res['trend'][i]), "mom": float(res['mom'][i]), "vol": float(res['vol'][i]),
+                "atr": v['atr'], "dcu": v['dcu'], "dcl": v['dcl'], "adx": v['adx'], "rsi": v['rsi']
+            }
+
+    def poll_symbol(self, symbol, resize, broker_now):
+        # Fetch stage for one symbol, run on the pool. Tick and (cached) contract spec go
+        # through the pre-filter first; only survivors whose tick opened a new bar pay
+        # for the rates top-up and indicator advance.
+        # Returns (tick, spec, bar_closed), a pre-filter reason, None when there is
+        # nothing to rescore, or NO_DATA when the symbol couldn't be read.
+        start, busy = time.perf_counter(), None   # busy: indicator time, kept out of the fetch sample
+        try:
+            tick = self.source.symbol_info_tick(symbol)
+            if not tick: return NO_DATA
+            spec = self.specs.get(symbol)
+            if not spec: return NO_DATA
+            static = self.bar_stage.get(symbol)
+            reason = prefilter_reason(tick, spec, static['atr'] if static else None, broker_now)
+            if reason: return reason
+            cache = self.bar_caches.get(symbol)
+            bar_open = tick.time - tick.time % self.bar_seconds
+            new_bar = cache is None or bar_open > cache.last_time
+            if not (new_bar or resize) and tick.time_msc == self.last_tick.get(symbol): return None
+            closed = False
+            if new_bar:
+                cache = self.fetch_bars(symbol)
+                if cache is None: return NO_DATA
+                t = time.perf_counter()
+                closed = self.update_indicators(symbol, cache) or symbol not in self.bar_stage
+                busy = time.perf_counter() - t
+            self.last_tick[symbol] = tick.time_msc
+            return tick, spec, closed
+        except Exception:
+            self.specs.invalidate(symbol)   # reloaded on the next poll, in case the contract changed
+            return NO_DATA
+        finally:
+            self.latency.record_symbol(symbol, time.perf_counter() - start - (busy or 0.0), busy)
+
+    def analyze_symbol(self, symbol, tick, spec):
+        # Gathers the live inputs of the tick stage for one symbol (no math here)
+        static = self.bar_stage.get(symbol)
+        if static is None: return None
+        return dict(static, symbol=symbol, bid=tick.bid, ask=tick.ask, point=spec.point,
+                    tick_value=spec.trade_tick_value, volume_step=spec.volume_step,
+                    volume_min=spec.volume_min, volume_max=spec.volume_max)
+
+    def scan_cycle(self, acct):
+        # Only symbols with a new tick are rescored, and only those whose tick falls
+        # into a new bar touch the rates at all. Everything else keeps its last row,
+        # unless the balance moved and every lot size has to be redone.
+        resize = acct.balance != self.sized_balance
+        self.sized_balance = acct.balance
+        if self.pool is None:
+            self.pool = ThreadPoolExecutor(max_workers=PropGuardConfig.FETCH_WORKERS, thread_name_prefix="fetch")
+
+        # Fetch stage: terminal requests go out concurrently, at most FETCH_WORKERS in flight
+        broker_now = self.scheduler.broker_time() if self.scheduler else None
+        with self.latency.time("fetch/cycle"):
+            polled = list(self.pool.map(lambda s: self.poll_symbol(s, resize, broker_now), self.active_symbols))
+        self.filtered = {s: p for s, p in zip(self.active_symbols, polled) if isinstance(p, str)}
+        for symbol, p in zip(self.active_symbols, polled):
+            if p is NO_DATA or symbol in self.filtered:   # no longer live: drop its last row
+                self.results.pop(symbol, None)
+                self.last_tick.pop(symbol, None)
+        changed = [(s, p) for s, p in zip(self.active_symbols, polled) if isinstance(p, tuple)]
+        start = time.perf_counter()
+        self.refresh_bar_stage([s for s, p in changed if p[2]])
+        for symbol, p in changed:
+            if p[2]: self.tracker.label(symbol, self.bar_caches[symbol])
+            self.tracker.tick(symbol, p[0])
+
+        # Scoring stage: one pass on this thread
+        rows = [r for r in (self.analyze_symbol(s, tick, spec) for s, (tick, spec, _) in changed) if r]
+        for symbol, _ in changed: self.results.pop(symbol, None)
+        scored, sizing = self.score_rows(rows, acct)
+        points = {r['symbol']: r['point'] for r in rows}
+        for row in scored:
+            self.results[row['symbol']] = row
+            self.tracker.observe(row, int(self.last_tick[row['symbol']]) // 1000, points[row['symbol']])
+        if changed:
+            self.latency.record("scoring/cycle", time.perf_counter() - start - sizing)
+            if rows: self.latency.record("sizing/cycle", sizing)
+        return [self.results[s] for s in self.active_symbols if s in self.results]
+
+    def score_rows(self, rows, acct):
+        # Tick stage: a handful of vectorized operations over the whole watchlist.
+        # Returns the rows and the time spent on lot sizing.
+        if not rows: return [], 0.0
+        cols = {k: np.array([r[k] for r in rows], dtype=float) for k in TICK_STAGE_INPUTS + SIZING_INPUTS}
+        res = score_tick_stage(**{k: cols[k] for k in TICK_STAGE_INPUTS}, rr_ratio=self.rr_ratio,
+                               weights=self.score_weights)
+        t = time.perf_counter()
+        res['lots'] = size_positions(res['entry'], res['sl'], **{k: cols[k] for k in SIZING_INPUTS},
+                                     balance=acct.balance, risk_pct=self.risk_per_trade)
+        sizing = time.perf_counter() - t
+        out = []
+        for i in np.flatnonzero(np.isfinite(res['score'])):
+            out.append({
+                "symbol": rows[i]['symbol'], "score": float(res['score'][i]), "bias": BIAS_NAMES[rows[i]['bias'] + 1],
+                "price": float(res['entry'][i]), "sl": float(res['sl'][i]), "tp": float(res['tp'][i]),
+                "lots": float(res['lots'][i]), "adx": rows[i]['adx'], "rsi": rows[i]['rsi'], "atr": rows[i]['atr'],
+                "spread": float(res['spread'][i]), "ema_dist": rows[i]['trend_str'],
+                "components": {"trend": rows[i]['trend'], "mom": rows[i]['mom'], "vol": rows[i]['vol'],
+                               "struct": float(res['struct'][i]), "liq": float(res['liq'][i])}
+            })
+        return out, sizing
+
+STARTUP.add("import scanner_engine", _IMPORT_T0, time.perf_counter())
+
+# ==========================================
+# 3️⃣ HEADLESS CLI
+# ==========================================
+def signal_summary(bands):
+    # "70-80: 41% +0.12R (32, 3 open)  ..." for the bands that have seen a signal
+    parts = []
+    for b in bands:
+        if not (b['trades'] or b['open']): continue
+        res = f"{100 * b['hit_rate']:.0f}% {b['expectancy_r']:+.2f}R" if b['trades'] else "-"
+        parts.append(f"{b['band']}: {res} ({b['trades']}, {b['open']} open)")
+    return "  ".join(parts) or "no signals yet"
+
+def print_snapshot(snapshot, top=0, as_json=False):
+    rows = snapshot['rows'][:top] if top else snapshot['rows']
+    if as_json:
+        print(json.dumps(dict(snapshot, rows=rows)), flush=True)
+        return
+    stats = snapshot['stats']
+    print(f"--- {snapshot['timestamp']}  Bal: ${stats['balance']:.2f}  Eq: ${stats['equity']:.2f}"
+          f"  Filtered: {stats.get('filtered', 0)}")
+    if stats.get('signals'): print(f"    Signals  {signal_summary(stats['signals'])}")
+    for d in rows:
+        print(f"{d['symbol']:<10} {d['score']:>5.1f}  {d['bias']:<8} {d['price']:>12.5f} "
+              f"SL {d['sl']:>12.5f}  TP {d['tp']:>12.5f}  {d['lots']:>6.2f} lots")
+    sys.stdout.flush()
+
+def main(argv=None):
+    import argparse
+    cfg = PropGuardConfig
+    p = argparse.ArgumentParser(description="PropGuard quant scanner without the GUI.")
+    p.add_argument("--symbols", help="comma separated list (default: every symbol in PropGuardConfig.ASSETS)")
+    p.add_argument("--groups", help="comma separated UNIVERSE_GROUPS names to scan in full, e.g. FOREX,CRYPTO")
+    p.add_argument("--risk", type=float, default=0.5, help="risk per trade, in %% of balance")
+    p.add_argument("--rr", type=float, default=2.0, help="reward to risk ratio")
+    p.add_argument("--timeframe", default=cfg.TIMEFRAME, choices=sorted(cfg.TIMEFRAME_SECONDS))
+    p.add_argument("--json", action="store_true", help="print one JSON object per cycle (JSON lines)")
+    p.add_argument("--top", type=int, default=0, help="only print the N best rows")
+    p.add_argument("--cycles", type=int, default=0, help="stop after N cycles (0 = until interrupted)")
+    p.add_argument("--replay", metavar="DIR", help="play back a record_replay() directory instead of MT5")
+    p.add_argument("--latency", metavar="FILE", help="write per-stage latency percentiles (JSON) to FILE")
+    p.add_argument("--weights", metavar="FILE", help="score weights fitted by walkforward.py (SCORE_WEIGHTS_FILE)")
+    p.add_argument("--speed", type=float, default=1.0, help="replay speed multiplier, 0 = as fast as possible")
+    args = p.parse_args(argv)
+
+    cfg.TIMEFRAME = args.timeframe
+    if args.latency: cfg.LATENCY_DUMP = args.latency
+    if args.weights: cfg.SCORE_WEIGHTS_FILE = args.weights
+    groups = args.groups.split(",") if args.groups else []
+    if args.symbols: symbols = args.symbols.split(",")
+    elif groups: symbols = []
+    else: symbols = [s for syms in cfg.ASSETS.values() for s in syms]
+    source = ReplaySource(args.replay, speed=args.speed or None) if args.replay else None
+    engine = ScanEngine(source)
+
+    def flush_logs():
+        for t, msg, _ in engine.logs.drain(): print(f"[{t}] {msg}", file=sys.stderr, flush=True)
+
+    seen = [0]
+    def consume(snapshot):
+        print_snapshot(snapshot, args.top, args.json)
+        flush_logs()
+        seen[0] += 1
+        if args.cycles and seen[0] >= args.cycles: engine.stop()
+
+    engine.consumers.append(consume)
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: engine.stop())
+    engine.set_config(symbols, args.risk, args.rr, groups)
+    ok = engine.run()
+    flush_logs()
+    engine.logs.close()
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,230 @@
+import sys
+import os
+import json
+import time
+import itertools
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from scanner_engine import PropGuardConfig
+from backtest import (History, INDICATOR_PARAMS, indicators_for, score_history, reweight, simulate_exits,
+                      trade_stats, history_from_args, add_history_args)
+
+# ==========================================
+# 1️⃣ PARAMETER SPACE
+# A parameter set is a flat dict: INDICATOR_PARAMS, ATR_MULTIPLIER and one entry per
+# SCORE_WEIGHTS component. Sets sharing everything but the weights are evaluated
+# together, since re-weighting reuses their indicators and simulated exits.
+# ==========================================
+WEIGHT_KEYS = tuple(PropGuardConfig.SCORE_WEIGHTS)
+MARKET_PARAMS = INDICATOR_PARAMS + ("ATR_MULTIPLIER",)
+RANDOM_SPACE = {   # name: (low, high, step)
+    "ATR_MULTIPLIER": (1.0, 3.0, 0.1),
+    "LOOKBACK": (10, 60, 5),
+    "EMA_PERIOD": (50, 300, 10),
+    "RSI_PERIOD": (7, 28, 1),
+    "ADX_PERIOD": (7, 28, 1),
+}
+
+def current_params():
+    cfg = PropGuardConfig
+    return dict({k: getattr(cfg, k) for k in MARKET_PARAMS}, **cfg.SCORE_WEIGHTS)
+
+def normalized(params):
+    # Weights rescaled to sum to 1, so every set scores on the same 0-100 scale
+    total = sum(params[k] for k in WEIGHT_KEYS)
+    if total <= 0 or min(params[k] for k in WEIGHT_KEYS) < 0:
+        raise ValueError(f"Weights must be >= 0 with a positive sum: {[params[k] for k in WEIGHT_KEYS]}")
+    return dict(params, **{k: params[k] / total for k in WEIGHT_KEYS})
+
+def grid(spec):
+    # spec: {name: [values]}; names not in the spec keep their config value
+    base = current_params()
+    unknown = set(spec) - set(base)
+    if unknown: raise ValueError(f"Unknown parameters: {', '.join(sorted(unknown))}")
+    names = list(spec)
+    return [normalized(dict(base, **dict(zip(names, combo)))) for combo in itertools.product(*(spec[n] for n in names))]
+
+def random_weights(rng):
+    return dict(zip(WEIGHT_KEYS, rng.dirichlet(np.ones(len(WEIGHT_KEYS))).tolist()))
+
+def random_sample(n, weight_samples=1, seed=0):
+    # n market parameter draws from RANDOM_SPACE, each with the config weights plus
+    # weight_samples - 1 random weightings summing to 1
+    rng = np.random.default_rng(seed)
+    out = []
+    for _ in range(n):
+        market = dict(current_params())
+        for name, (lo, hi, step) in RANDOM_SPACE.items():
+            value = lo + step * rng.integers(0, int(round((hi - lo) / step)) + 1)
+            market[name] = round(float(value), 6) if isinstance(step, float) else int(value)
+        out.append(market)
+        out += [dict(market, **random_weights(rng)) for _ in range(weight_samples - 1)]
+    return out
+
+def group_tasks(param_sets):
+    groups = {}
+    for p in param_sets: groups.setdefault(tuple(p[k] for k in MARKET_PARAMS), []).append(p)
+    return list(groups.values())
+
+# ==========================================
+# 2️⃣ SHARED MEMORY
+# The history is copied once into shared memory blocks; workers map them read-only
+# instead of receiving a pickled copy with every task.
+# ==========================================
+SHARED_FIELDS = ("time", "high", "low", "close", "spread", "point", "lengths")
+
+class SharedHistory:
+    def __init__(self, hist):
+        self.blocks = []
+        self.spec = {"symbols": hist.symbols, "timeframe": hist.timeframe, "arrays": {}}
+        for name in SHARED_FIELDS:
+            a = np.ascontiguousarray(getattr(hist, name))
+            shm = shared_memory.SharedMemory(create=True, size=max(a.nbytes, 1))
+            np.ndarray(a.shape, a.dtype, buffer=shm.buf)[...] = a
+            self.blocks.append(shm)
+            self.spec["arrays"][name] = (shm.name, a.shape, a.dtype.str)
+
+    def close(self):
+        for shm in self.blocks:
+            shm.close()
+            shm.unlink()
+
+    @staticmethod
+    def attach(spec):
+        blocks, arrays = [], {}
+        for name, (shm_name, shape, dtype) in spec["arrays"].items():
+            shm = shared_memory.SharedMemory(name=shm_name)
+            blocks.append(shm)
+            arrays[name] = np.ndarray(shape, np.dtype(dtype), buffer=shm.buf)
+            arrays[name].flags.writeable = False
+        return History.from_arrays(spec["symbols"], spec["timeframe"], **arrays), blocks
+
+# ==========================================
+# 3️⃣ WORKERS
+# ==========================================
+WORKER = {}
+
+def init_worker(spec):
+    WORKER["hist"], WORKER["blocks"] = SharedHistory.attach(spec)   # blocks kept alive with the views
+
+def evaluate_group(param_sets, rr_ratio, horizon, min_score, cutoff):
+    # One indicator pass and one exit simulation for the group's market parameters,
+    # then a cheap re-weighting per parameter set
+    hist = WORKER["hist"]
+    market = param_sets[0]
+    ind = indicators_for(hist, market)
+    res = score_history(hist, ind, rr_ratio, atr_multiplier=market["ATR_MULTIPLIER"])
+    outcome, r_mult, held = simulate_exits(hist, res['bias'], res['entry'], res['sl'], res['tp'], horizon)
+    valid = hist.valid
+    # In-sample trades must also exit before the cutoff, as in walkforward.py
+    exit_col = np.minimum(np.arange(hist.time.shape[1]) + held, hist.lengths[:, None] - 1)
+    exit_time = np.take_along_axis(hist.time, np.maximum(exit_col, 0), axis=1)
+    in_sample = valid & (exit_time < cutoff)
+    out_sample = valid & (hist.time >= cutoff)
+    results = []
+    for p in param_sets:
+        with np.errstate(invalid='ignore'):
+            signal = reweight(res, {k: p[k] for k in WEIGHT_KEYS}, valid) >= min_score
+        ins = trade_stats(outcome, r_mult, signal & in_sample)
+        oos = trade_stats(outcome, r_mult, signal & out_sample)
+        results.append(dict(p, **{f"is_{k}": v for k, v in ins.items()}, **{f"oos_{k}": v for k, v in oos.items()}))
+    return results
+
+# ==========================================
+# 4️⃣ RUNNER
+# ==========================================
+def split_time(hist, oos_fraction):
+    # Timestamp splitting the pooled bars into in-sample (before) and out-of-sample (after)
+    return int(np.quantile(hist.time[hist.valid], 1.0 - oos_fraction))
+
+def rank(results, min_trades):
+    ok = [r for r in results if r["oos_trades"] >= max(min_trades, 1)]
+    return sorted(ok, key=lambda r: r["oos_expectancy_r"], reverse=True)
+
+def run_sweep(hist, param_sets, workers=None, rr_ratio=2.0, horizon=100, min_score=70.0, oos_fraction=0.3,
+              progress=None):
+    cutoff = split_time(hist, oos_fraction)
+    tasks = group_tasks(param_sets)
+    shared = SharedHistory(hist)
+    results = []
+    try:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), initializer=init_worker,
+                                 initargs=(shared.spec,)) as pool:
+            futures = [pool.submit(evaluate_group, t, rr_ratio, horizon, min_score, cutoff) for t in tasks]
+            for done, f in enumerate(as_completed(futures), 1):
+                results += f.result()
+                if progress: progress(done, len(tasks))
+    finally:
+        shared.close()
+    return results, cutoff
+
+# ==========================================
+# 5️⃣ CLI
+# ==========================================
+def parse_grid(items):
+    spec = {}
+    for item in items:
+        name, _, values = item.partition("=")
+        spec[name.strip()] = [float(v) if "." in v else int(v) for v in values.split(",")]
+    return spec
+
+def main(argv=None):
+    import argparse
+    p = argparse.ArgumentParser(description="Parameter sweep of the scanner's config and score weights, "
+                                            "ranked by out-of-sample expectancy.")
+    add_history_args(p)
+    p.add_argument("--grid", action="append", default=[], metavar="NAME=V1,V2",
+                   help="grid values for one parameter (repeatable), e.g. EMA_PERIOD=100,200 or trend=0.2,0.3")
+    p.add_argument("--random", type=int, default=0, metavar="N", help="N random market parameter sets")
+    p.add_argument("--weight-samples", type=int, default=10, help="weightings tried per random market set")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--workers", type=int, default=0, help="processes (default: one per core)")
+    p.add_argument("--rr", type=float, default=2.0)
+    p.add_argument("--horizon", type=int, default=100)
+    p.add_argument("--min-score", type=float, default=PropGuardConfig.WATCH_SCORE,
+                   help="score at which a bar counts as a signal")
+    p.add_argument("--oos", type=float, default=0.3, help="share of the history (by time) held out")
+    p.add_argument("--min-trades", type=int, default=30, help="out-of-sample trades needed to be ranked")
+    p.add_argument("--top", type=int, default=15)
+    p.add_argument("--out", default="sweep_results.json")
+    args = p.parse_args(argv)
+
+    try:
+        if args.grid: param_sets = grid(parse_grid(args.grid))
+        elif args.random: param_sets = random_sample(args.random, args.weight_samples, args.seed)
+        else: p.error("give --grid and/or --random")
+    except ValueError as e:
+        p.error(str(e))
+    if args.grid and args.random: param_sets += random_sample(args.random, args.weight_samples, args.seed)
+
+    hist = history_from_args(args)
+    if not hist.symbols:
+        print("No history loaded", file=sys.stderr)
+        return 1
+    print(f"{len(param_sets)} parameter sets in {len(group_tasks(param_sets))} indicator passes over "
+          f"{len(hist.symbols)} symbols / {int(hist.lengths.sum())} bars", flush=True)
+    t = time.perf_counter()
+    results, cutoff = run_sweep(hist, param_sets, args.workers or None, args.rr, args.horizon, args.min_score,
+                                args.oos, lambda d, n: print(f"\r{d}/{n}", end="", file=sys.stderr, flush=True))
+    elapsed = time.perf_counter() - t
+    ranked = rank(results, args.min_trades)
+    print(f"\nDone in {elapsed:.1f}s. Ranked {len(ranked)} of {len(results)} sets "
+          f"(>= {args.min_trades} OOS trades at score >= {args.min_score:g})")
+    cols = MARKET_PARAMS + WEIGHT_KEYS
+    print("  ".join(f"{c[:8]:>8}" for c in cols) + f"{'IS E[R]':>9}{'OOS E[R]':>9}{'OOS hit':>8}{'OOS n':>7}")
+    for r in ranked[:args.top]:
+        is_exp = f"{r['is_expectancy_r']:+.3f}" if r['is_trades'] else "-"
+        print("  ".join(f"{r[c]:>8g}" for c in cols) +
+              f"{is_exp:>9}{r['oos_expectancy_r']:>+9.3f}{100 * r['oos_hit_rate']:>7.1f}%{r['oos_trades']:>7}")
+    with open(args.out, "w") as f:
+        json.dump({"symbols": hist.symbols, "timeframe": hist.timeframe, "oos_from": cutoff, "rr": args.rr,
+                   "horizon": args.horizon, "min_score": args.min_score, "elapsed_s": elapsed,
+                   "ranked": ranked, "all": results}, f, indent=1)
+    print(f"Results written to {args.out}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
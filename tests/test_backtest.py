@@ -0,0 +1,96 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from scanner_engine import PropGuardConfig, ScanEngine, IndicatorEngine
+from backtest import (synthetic_history, indicator_arrays, score_history, reweight, simulate_exits, bucket_report,
+                      run_backtest, OUTCOME_OPEN, OUTCOME_TP, OUTCOME_SL, OUTCOME_TIMEOUT)
+
+@pytest.fixture(scope="module")
+def hist():
+    return synthetic_history(6, PropGuardConfig.EMA_PERIOD + 200, seed=11)
+
+@pytest.fixture(scope="module")
+def scored(hist):
+    return score_history(hist, indicator_arrays(hist.high, hist.low, hist.close))
+
+def test_scores_match_live_engine(hist, scored):
+    # Each bar scored through the engine's own bar and tick stages, fed by the
+    # streaming indicators, with the quote the backtest assumes at the bar close
+    engine = SimpleNamespace(indicators={s: IndicatorEngine() for s in hist.symbols}, bar_stage={},
+                             rr_ratio=2.0, risk_per_trade=0.5, score_weights=PropGuardConfig.SCORE_WEIGHTS)
+    acct = SimpleNamespace(balance=100000.0)
+    compared = 0
+    for t in range(hist.time.shape[1]):
+        for i, s in enumerate(hist.symbols):
+            engine.indicators[s].update({"time": hist.time[i, t], "high": hist.high[i, t], "low": hist.low[i, t],
+                                         "close": hist.close[i, t]})
+        ScanEngine.refresh_bar_stage(engine, hist.symbols)
+        rows = []
+        for i, s in enumerate(hist.symbols):
+            bid = hist.close[i, t]
+            tick = SimpleNamespace(bid=bid, ask=bid + hist.spread[i, t] * hist.point[i])
+            spec = SimpleNamespace(point=hist.point[i], trade_tick_value=1.0, volume_step=0.01, volume_min=0.01,
+                                   volume_max=100.0)
+            rows.append(ScanEngine.analyze_symbol(engine, s, tick, spec))
+        live = {r['symbol']: r for r in ScanEngine.score_rows(engine, rows, acct)[0]}
+        for i, s in enumerate(hist.symbols):
+            if s not in live:
+                assert np.isnan(scored['score'][i, t])
+                continue
+            row = live[s]
+            assert row['score'] == pytest.approx(scored['score'][i, t], abs=1e-9)
+            assert row['bias'] == ("BEARISH", "NEUTRAL", "BULLISH")[scored['bias'][i, t] + 1]
+            for k, col in (("price", "entry"), ("sl", "sl"), ("tp", "tp")):
+                assert row[k] == pytest.approx(scored[col][i, t], rel=1e-12)
+            compared += 1
+    assert compared > len(hist.symbols) * 100
+
+def test_reweight_with_config_weights_reproduces_score(hist, scored):
+    again = reweight(scored, PropGuardConfig.SCORE_WEIGHTS, hist.valid)
+    np.testing.assert_array_equal(again, scored['score'])
+
+def reference_exits(hist, bias, entry, sl, tp, horizon):
+    # One trade at a time, straight from the rules
+    S, T = entry.shape
+    outcome, r_mult, held = np.zeros((S, T), dtype=np.int8), np.full((S, T), np.nan), np.zeros((S, T), dtype=np.int32)
+    for i in range(S):
+        for t in range(hist.lengths[i]):
+            risk = abs(entry[i, t] - sl[i, t])
+            if not np.isfinite(entry[i, t]) or not risk > 0: continue
+            long = bias[i, t] == 1
+            for k in range(1, horizon + 1):
+                at = t + k
+                if at >= hist.lengths[i]: break
+                sp = hist.spread[i, at] * hist.point[i]
+                hi, lo = hist.high[i, at], hist.low[i, at]
+                stop = lo <= sl[i, t] if long else hi + sp >= sl[i, t]
+                take = hi >= tp[i, t] if long else lo + sp <= tp[i, t]
+                if stop: outcome[i, t], r_mult[i, t] = OUTCOME_SL, -1.0
+                elif take: outcome[i, t], r_mult[i, t] = OUTCOME_TP, abs(tp[i, t] - entry[i, t]) / risk
+                elif k == horizon:
+                    px = hist.close[i, at] + (0.0 if long else sp)
+                    outcome[i, t] = OUTCOME_TIMEOUT
+                    r_mult[i, t] = ((px - entry[i, t]) if long else (entry[i, t] - px)) / risk
+                else: continue
+                held[i, t] = k
+                break
+    return outcome, r_mult, held
+
+def test_simulate_exits_matches_reference(hist, scored):
+    args = (hist, scored['bias'], scored['entry'], scored['sl'], scored['tp'], 25)
+    outcome, r_mult, held = simulate_exits(*args)
+    ref_outcome, ref_r, ref_held = reference_exits(*args)
+    np.testing.assert_array_equal(outcome, ref_outcome)
+    np.testing.assert_allclose(r_mult, ref_r, rtol=1e-12, equal_nan=True)
+    np.testing.assert_array_equal(held, ref_held)
+    assert {OUTCOME_TP, OUTCOME_SL, OUTCOME_TIMEOUT, OUTCOME_OPEN} <= set(np.unique(outcome))
+
+def test_bucket_report_counts_closed_trades(hist):
+    res, report, _ = run_backtest(hist, horizon=25)
+    closed = (res['outcome'] != OUTCOME_OPEN) & np.isfinite(res['score'])
+    assert sum(b['trades'] for b in report) == int(closed.sum())
+    for b in report:
+        assert b['wins'] + b['losses'] + b['timeouts'] == b['trades']
+    assert report == bucket_report(res['score'], res['outcome'], res['r'])
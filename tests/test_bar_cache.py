@@ -0,0 +1,38 @@
+import numpy as np
+
+from scanner_engine import BarCache, BAR_FIELDS
+
+BAR = 3600
+
+def bars(start, n, close=1.0):
+    out = np.zeros(n, dtype=BAR_FIELDS)
+    out['time'] = (start + np.arange(n)) * BAR
+    out['close'] = close
+    out['high'], out['low'] = close + 0.5, close - 0.5
+    return out
+
+def test_merge_appends_and_patches_forming_bar():
+    cache = BarCache(10)
+    assert cache.merge(bars(0, 5)) == 5
+    assert cache.merge(bars(4, 1, close=2.0)) == 0   # forming bar patched in place
+    assert cache.count == 5 and cache.view()['close'][-1] == 2.0
+    assert cache.merge(bars(3, 4, close=3.0)) == 2   # overlap: older bars ignored
+    np.testing.assert_array_equal(cache.view()['time'], np.arange(7) * BAR)
+    np.testing.assert_array_equal(cache.view()['close'], [1, 1, 1, 1, 3, 3, 3])
+
+def test_merge_wraps_around_capacity():
+    cache = BarCache(8)
+    cache.merge(bars(0, 6))
+    for t in range(6, 30, 3): cache.merge(bars(t - 1, 4))
+    assert cache.count == 8
+    np.testing.assert_array_equal(cache.view()['time'], np.arange(22, 30) * BAR)
+    assert cache.first_time == 22 * BAR and cache.last_time == 29 * BAR
+
+def test_since_returns_newer_bars_oldest_first():
+    cache = BarCache(8)
+    cache.merge(bars(0, 6))
+    cache.merge(bars(5, 7))
+    np.testing.assert_array_equal(cache.since(9 * BAR)['time'], [10 * BAR, 11 * BAR])
+    np.testing.assert_array_equal(cache.since(9 * BAR + 1)['time'], [10 * BAR, 11 * BAR])
+    assert len(cache.since(11 * BAR)) == 0
+    np.testing.assert_array_equal(cache.since(-1)['time'], cache.view()['time'])
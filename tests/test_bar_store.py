@@ -0,0 +1,39 @@
+import os
+
+import numpy as np
+
+from scanner_engine import BarStore, BAR_FIELDS
+
+BAR = 3600
+
+def bars(start, n, close=1.0):
+    out = np.zeros(n, dtype=BAR_FIELDS)
+    out['time'] = (start + np.arange(n)) * BAR
+    out['close'] = close
+    out['high'], out['low'] = close + 0.5, close - 0.5
+    return out
+
+def test_store_round_trip_and_append(tmp_path):
+    store = BarStore(str(tmp_path))
+    store.write("EURUSD", bars(0, 5))
+    store.write("EURUSD", bars(3, 4))                 # only 5 and 6 are new
+    np.testing.assert_array_equal(BarStore(str(tmp_path)).read("EURUSD", 100)['time'], np.arange(7) * BAR)
+    assert BarStore(str(tmp_path)).read("GBPUSD", 100) is None
+
+def test_store_truncates_torn_record(tmp_path):
+    store = BarStore(str(tmp_path))
+    store.write("XAU/USD", bars(0, 4))
+    path = store.path("XAU/USD")
+    size = os.path.getsize(path)
+    with open(path, "ab") as f: f.write(bars(4, 1).tobytes()[:17])   # crash mid-record
+    restarted = BarStore(str(tmp_path))
+    np.testing.assert_array_equal(restarted.read("XAU/USD", 100)['time'], np.arange(4) * BAR)
+    assert os.path.getsize(path) == size
+    restarted.write("XAU/USD", bars(3, 3))
+    np.testing.assert_array_equal(restarted.read("XAU/USD", 3)['time'], np.arange(3, 6) * BAR)
+
+def test_store_starts_over_after_a_gap(tmp_path):
+    store = BarStore(str(tmp_path))
+    store.write("EURUSD", bars(0, 5))
+    store.write("EURUSD", bars(50, 3))
+    np.testing.assert_array_equal(store.read("EURUSD", 100)['time'], np.arange(50, 53) * BAR)
@@ -0,0 +1,39 @@
+import sys
+
+from scanner_engine import ScanEngine
+from bench_scanner import SyntheticMarket, install, BenchSource
+
+def run_engine(market, cycles, on_cycle=None):
+    engine = ScanEngine(BenchSource(market, 60))
+    engine.set_config(list(market.names), 0.5, 2.0)
+    ranked = []
+    def consume(snapshot):
+        ranked.append({r['symbol'] for r in snapshot['rows']})
+        if on_cycle: on_cycle(len(ranked))
+        if len(ranked) >= cycles: engine.stop()
+    engine.consumers.append(consume)
+    assert engine.run()
+    return ranked
+
+def test_symbol_that_stops_quoting_leaves_the_ranking():
+    market = SyntheticMarket(8, seed=3)
+    install(market)
+    mt5 = sys.modules["MetaTrader5"]
+    dead, quote = market.names[0], mt5.symbol_info_tick
+    def cut(n):
+        if n == 3: mt5.symbol_info_tick = lambda s: None if s == dead else quote(s)
+    ranked = run_engine(market, 6, cut)
+    assert dead in ranked[2]
+    assert not any(dead in r for r in ranked[3:])
+
+def test_new_session_reloads_contract_specs():
+    market = SyntheticMarket(4, seed=5)
+    install(market)
+    engine = ScanEngine(BenchSource(market, 60))
+    engine.set_config(list(market.names), 0.5, 2.0)
+    engine.consumers.append(lambda snapshot: engine.stop())
+    assert engine.run()
+    cache = engine.specs
+    assert set(cache.specs) == set(market.names)
+    assert engine.start_session()
+    assert engine.specs is cache and not cache.specs
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from scanner_engine import PropGuardConfig, EWM, RMA, SeededEMA, RollingMax, IndicatorEngine
+from backtest import synthetic_history, indicator_arrays
+
+# Reference formulas written out from the pandas / pandas_ta definitions
+def ewm_adjusted(x, alpha, min_periods=0):
+    # Series.ewm(alpha, adjust=True).mean() without NaNs: weights (1 - alpha)^i
+    out = np.full(len(x), np.nan)
+    for t in range(len(x)):
+        w = (1.0 - alpha) ** np.arange(t, -1, -1)
+        if t + 1 >= max(min_periods, 1): out[t] = (w * x[:t + 1]).sum() / w.sum()
+    return out
+
+def ewm_recursive(x, alpha):
+    # Series.ewm(alpha, adjust=False).mean(): y0 = x0, y = (1 - alpha) y + alpha x
+    out = np.empty(len(x))
+    out[0] = x[0]
+    for t in range(1, len(x)): out[t] = (1.0 - alpha) * out[t - 1] + alpha * x[t]
+    return out
+
+def stream(ind, xs, method="update"):
+    return np.array([getattr(ind, method)(float(x)) for x in xs])
+
+@pytest.fixture(scope="module")
+def walk():
+    return 100.0 + np.cumsum(np.random.default_rng(1).standard_normal(300))
+
+def test_ewm_adjusted_matches_pandas_formula(walk):
+    np.testing.assert_allclose(stream(EWM(0.1), walk), ewm_adjusted(walk, 0.1), rtol=1e-12)
+
+def test_ewm_recursive_matches_pandas_formula(walk):
+    np.testing.assert_allclose(stream(EWM(0.1, adjust=False), walk), ewm_recursive(walk, 0.1), rtol=1e-12)
+
+def test_ewm_skips_leading_nans(walk):
+    xs = np.concatenate([[np.nan] * 3, walk[:50]])
+    out = stream(EWM(0.2, adjust=False), xs)
+    assert np.isnan(out[:3]).all()
+    np.testing.assert_allclose(out[3:], ewm_recursive(walk[:50], 0.2), rtol=1e-12)
+
+def test_rma_respects_min_periods(walk):
+    out = stream(RMA(14), walk)
+    np.testing.assert_allclose(out, ewm_adjusted(walk, 1.0 / 14, min_periods=14), rtol=1e-12)
+    assert np.isnan(out[:13]).all() and not np.isnan(out[13])
+
+def test_seeded_ema_starts_from_sma(walk):
+    out = stream(SeededEMA(20), walk)
+    ref = np.full(len(walk), np.nan)
+    ref[19:] = ewm_recursive(np.concatenate([[walk[:20].mean()], walk[20:]]), 2.0 / 21)
+    np.testing.assert_allclose(out, ref, rtol=1e-12)
+
+def test_rolling_max_matches_window_max(walk):
+    out = stream(RollingMax(10), walk, "push")
+    assert np.isnan(out[:9]).all()
+    np.testing.assert_array_equal(out[9:], [walk[t - 9:t + 1].max() for t in range(9, len(walk))])
+
+def test_against_pandas():
+    pd = pytest.importorskip("pandas")
+    x = pd.Series(np.random.default_rng(2).standard_normal(200).cumsum())
+    np.testing.assert_allclose(stream(EWM(0.1), x), x.ewm(alpha=0.1, adjust=True).mean(), rtol=1e-12)
+    np.testing.assert_allclose(stream(RMA(14), x), x.ewm(alpha=1 / 14, adjust=True, min_periods=14).mean(),
+                               rtol=1e-12)
+
+def test_indicator_engine_matches_indicator_arrays():
+    hist = synthetic_history(4, PropGuardConfig.EMA_PERIOD + 150, seed=5)
+    ref = indicator_arrays(hist.high, hist.low, hist.close)
+    for i in range(len(hist.symbols)):
+        eng = IndicatorEngine()
+        for t in range(hist.lengths[i]):
+            bar = {"time": hist.time[i, t], "high": hist.high[i, t], "low": hist.low[i, t], "close": hist.close[i, t]}
+            values = eng.update(bar)
+            for k, v in values.items():
+                np.testing.assert_allclose(v, ref[k][i, t], rtol=1e-9, equal_nan=True, err_msg=f"{k} at bar {t}")
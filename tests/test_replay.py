@@ -0,0 +1,45 @@
+import json
+
+import numpy as np
+import pytest
+
+from scanner_engine import ReplaySource, REPLAY_TICK_FIELDS, BAR_FIELDS
+
+BAR = 3600
+
+@pytest.fixture
+def replay(tmp_path):
+    # Three H1 bars; ticks only inside the last one, from 30 minutes in
+    rates = np.zeros(3, dtype=BAR_FIELDS)
+    rates['time'] = np.arange(3) * BAR
+    rates['open'], rates['high'], rates['low'], rates['close'] = 1.0, 1.5, 0.5, 1.2
+    ticks = np.zeros(2, dtype=list(REPLAY_TICK_FIELDS))
+    ticks['time_msc'] = (2 * BAR + np.array([1800, 2400])) * 1000
+    ticks['bid'], ticks['ask'] = [1.1, 0.9], [1.1001, 0.9001]
+    np.savez(tmp_path / "EURUSD.npz", rates=rates, ticks=ticks)
+    meta = {"timeframe": "H1", "symbols": {"EURUSD": {"point": 1e-4}}, "account": {"balance": 1.0}}
+    (tmp_path / "meta.json").write_text(json.dumps(meta))
+    source = ReplaySource(str(tmp_path), speed=None)
+    assert source.initialize()
+    return source
+
+def test_forming_bar_is_built_from_ticks_seen(replay):
+    replay.clock_ms = (2 * BAR + 60) * 1000   # bar open, no tick yet
+    bar = replay.copy_rates_from_pos("EURUSD", "H1", 0, 10)[-1]
+    assert (bar['open'], bar['high'], bar['low'], bar['close']) == (1.0, 1.0, 1.0, 1.0)
+    replay.advance()
+    bar = replay.copy_rates_from_pos("EURUSD", "H1", 0, 10)[-1]
+    assert (bar['high'], bar['low'], bar['close']) == (1.1, 1.0, 1.1)
+    replay.advance()
+    bar = replay.copy_rates_from_pos("EURUSD", "H1", 0, 10)[-1]
+    assert (bar['high'], bar['low'], bar['close']) == (1.1, 0.9, 0.9)
+
+def test_closed_bars_are_untouched(replay):
+    replay.clock_ms = (2 * BAR + 60) * 1000
+    closed = replay.copy_rates_from_pos("EURUSD", "H1", 1, 10)
+    np.testing.assert_array_equal(closed['high'], [1.5, 1.5])
+
+def test_timeframe_mismatch(replay):
+    replay.check_timeframe("H1")
+    with pytest.raises(ValueError):
+        replay.check_timeframe("M15")
@@ -0,0 +1,34 @@
+import pytest
+
+import scanner_engine
+from scanner_engine import CycleScheduler
+
+class FrozenClock:
+    # A paced replay between advance() calls: its clock doesn't move while a cycle runs
+    def __init__(self, now, clock_rate):
+        self.now, self.clock_rate = now, clock_rate
+        self.slept = []
+
+    def time(self): return self.now
+    def sleep(self, seconds): self.slept.append(seconds)
+
+def test_cycle_run_time_is_subtracted(monkeypatch):
+    wall = [100.0]
+    monkeypatch.setattr(scanner_engine.time, "monotonic", lambda: wall[0])
+    source = FrozenClock(1000.0, clock_rate=2.0)
+    sched = CycleScheduler(source, 3600, tick_interval=1.0, close_grace=0.0)
+    sched.wait()
+    assert source.slept == [1.0]           # one source second = 0.5 s of wall time at 2x
+    wall[0] += 0.5 + 0.3                   # the sleep, then a cycle running 0.3 s
+    sched.wait()
+    assert source.slept[-1] == pytest.approx(0.4)        # only the rest of the interval
+    wall[0] += 0.2 + 0.9                   # a cycle overrunning the next slot
+    sched.wait()
+    assert source.slept[-1] == pytest.approx(0.2)        # rejoins the grid: next slot at wall 102.0
+
+def test_bar_close_wakes_early(monkeypatch):
+    monkeypatch.setattr(scanner_engine.time, "monotonic", lambda: 0.0)
+    source = FrozenClock(3600.0 - 0.25, clock_rate=1.0)
+    sched = CycleScheduler(source, 3600, tick_interval=1.0, close_grace=0.05)
+    sched.wait()
+    assert source.slept[-1] == pytest.approx(0.30)
@@ -0,0 +1,126 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from scanner_engine import PropGuardConfig, SignalTracker, BarCache, BAR_FIELDS, BIAS_NAMES
+from backtest import (synthetic_history, indicator_arrays, score_history, simulate_exits,
+                      OUTCOME_OPEN, OUTCOME_TP, OUTCOME_SL)
+
+HORIZON = 20
+OUTCOMES = {"TP": OUTCOME_TP, "SL": OUTCOME_SL}
+
+@pytest.fixture(scope="module")
+def hist():
+    return synthetic_history(4, PropGuardConfig.EMA_PERIOD + 150, seed=3)
+
+def rates(hist, i):
+    out = np.zeros(hist.lengths[i], dtype=BAR_FIELDS)
+    for f in ("time", "open", "high", "low", "close", "spread"): out[f] = getattr(hist, f)[i, :hist.lengths[i]]
+    return out
+
+def signal(symbol, t_bar, bar_seconds, bias, entry, sl, tp, point, score=75.0):
+    t = int(t_bar) + bar_seconds - 1
+    return {"type": "signal", "id": f"{symbol}@{t}", "symbol": symbol, "time": t, "bar": int(t_bar), "score": score,
+            "bias": bias, "entry": float(entry), "sl": float(sl), "tp": float(tp), "point": float(point)}
+
+def test_labels_match_simulate_exits(hist):
+    # Signals at every scored bar, labelled as bars arrive one at a time
+    res = score_history(hist, indicator_arrays(hist.high, hist.low, hist.close))
+    outcome, r_mult, held = simulate_exits(hist, res['bias'], res['entry'], res['sl'], res['tp'], HORIZON)
+    bar_seconds = int(hist.time[0, 1] - hist.time[0, 0])
+    tracker = SignalTracker(bar_seconds, bands=(0, 100.1), horizon=HORIZON)
+    checked = 0
+    for i, s in enumerate(hist.symbols):
+        r = rates(hist, i)
+        cache = BarCache(len(r))
+        labelled = {}
+        for t in range(len(r)):
+            cache.merge(r[t:t + 1])           # bar t is forming
+            for e in tracker.label(s, cache): labelled[e['id']] = e
+            if np.isfinite(res['score'][i, t]) and abs(res['entry'][i, t] - res['sl'][i, t]) > 0:
+                tracker.track(signal(s, r['time'][t], bar_seconds, BIAS_NAMES[res['bias'][i, t] + 1],
+                                     res['entry'][i, t], res['sl'][i, t], res['tp'][i, t], hist.point[i]))
+        for t in np.flatnonzero(np.isfinite(res['score'][i]) & (np.abs(res['entry'][i] - res['sl'][i]) > 0)):
+            e = labelled.get(f"{s}@{int(r['time'][t]) + bar_seconds - 1}")
+            if outcome[i, t] == OUTCOME_OPEN:
+                assert e is None
+                continue
+            assert OUTCOMES.get(e['outcome'], 2) == outcome[i, t]
+            assert e['r'] == pytest.approx(r_mult[i, t], rel=1e-12)
+            assert e['bars'] == held[i, t]
+            checked += 1
+    assert checked > 500
+    assert sum(b['trades'] for b in tracker.report()) == checked
+
+def long_signal(**kw):
+    return dict(signal("EURUSD", 7200, 3600, "BULLISH", 1.1000, 1.0950, 1.1100, 1e-5), **kw)
+
+def test_tick_inside_signal_bar_exits():
+    tracker = SignalTracker(3600, bands=(70, 100.1))
+    sig = dict(long_signal(), time=7300, id="EURUSD@7300")
+    tracker.track(sig)
+    assert tracker.tick("EURUSD", SimpleNamespace(time=7300, bid=1.0900, ask=1.0901)) == []   # the signal's own tick
+    assert tracker.tick("EURUSD", SimpleNamespace(time=7400, bid=1.1050, ask=1.1051)) == []
+    [e] = tracker.tick("EURUSD", SimpleNamespace(time=7500, bid=1.1100, ask=1.1101))
+    assert (e['outcome'], e['r'], e['bars'], e['exit_time']) == ("TP", pytest.approx(2.0), 0, 7500)
+    assert tracker.open["EURUSD"] == []
+
+def test_tick_after_signal_bar_is_ignored():
+    tracker = SignalTracker(3600, bands=(70, 100.1))
+    tracker.track(long_signal())
+    assert tracker.tick("EURUSD", SimpleNamespace(time=10800, bid=1.0, ask=1.0001)) == []
+    assert len(tracker.open["EURUSD"]) == 1
+
+def test_short_ticks_exit_on_ask():
+    tracker = SignalTracker(3600, bands=(70, 100.1))
+    tracker.track(dict(signal("EURUSD", 7200, 3600, "BEARISH", 1.1000, 1.1050, 1.0900, 1e-5), time=7300))
+    assert tracker.tick("EURUSD", SimpleNamespace(time=8000, bid=1.1045, ask=1.1049)) == []
+    [e] = tracker.tick("EURUSD", SimpleNamespace(time=8100, bid=1.1046, ask=1.1050))
+    assert (e['outcome'], e['r']) == ("SL", -1.0)
+
+def row(score, symbol="EURUSD"):
+    return {"symbol": symbol, "score": score, "bias": "BULLISH", "price": 1.1, "sl": 1.095, "tp": 1.11}
+
+def test_one_signal_per_crossing():
+    tracker = SignalTracker(3600, bands=(70, 100.1))
+    assert tracker.observe(row(75), 7300, 1e-5)
+    assert tracker.observe(row(80), 7400, 1e-5) is None      # still above
+    assert tracker.observe(row(60), 7500, 1e-5) is None
+    assert tracker.observe(row(72), 7600, 1e-5) is None      # crossed again, but in the same bar
+    assert tracker.observe(row(60), 14500, 1e-5) is None
+    assert tracker.observe(row(72), 14600, 1e-5)
+
+def test_journal_restores_state(tmp_path):
+    path = str(tmp_path / "H1.jsonl")
+    tracker = SignalTracker(3600, path, bands=(70, 100.1), horizon=HORIZON)
+    tracker.observe(row(75), 7300, 1e-5)
+    tracker.observe(row(75, "GBPUSD"), 7300, 1e-5)
+    tracker.observe(row(60, "GBPUSD"), 7400, 1e-5)
+    tracker.tick("EURUSD", SimpleNamespace(time=7400, bid=1.11, ask=1.1101))
+    tracker.observe(row(75, "USDJPY"), 7300, 1e-5)
+    tracker.close()
+    with open(path, "a") as f: f.write('{"type": "outcome", "id": "USDJ')   # crash mid-line
+
+    restarted = SignalTracker(3600, path, bands=(70, 100.1), horizon=HORIZON)
+    assert restarted.report() == tracker.report()
+    assert [s['id'] for v in restarted.open.values() for s in v] == ["GBPUSD@7300", "USDJPY@7300"]
+    # EURUSD stayed above 70 across the restart; GBPUSD had dropped below
+    assert restarted.observe(row(75), 11000, 1e-5) is None
+    assert restarted.observe(row(75, "GBPUSD"), 11000, 1e-5)
+    restarted.close()
+    with open(path) as f: assert all(line.endswith("\n") for line in f)
+
+def test_crossing_without_signal_survives_restart(tmp_path):
+    path = str(tmp_path / "H1.jsonl")
+    tracker = SignalTracker(3600, path, bands=(70, 100.1), horizon=HORIZON)
+    tracker.observe(row(75), 7300, 1e-5)
+    tracker.observe(row(60), 7400, 1e-5)
+    assert tracker.observe(row(75), 7500, 1e-5) is None          # same bar: no second signal
+    assert tracker.observe(dict(row(75, "GBPUSD"), sl=1.1), 7300, 1e-5) is None   # no risk
+    tracker.close()
+    restarted = SignalTracker(3600, path, bands=(70, 100.1), horizon=HORIZON)
+    assert restarted.above == {"EURUSD", "GBPUSD"}
+    assert restarted.observe(row(75), 11000, 1e-5) is None
+    assert restarted.observe(row(75, "GBPUSD"), 11000, 1e-5) is None
+    restarted.close()
@@ -0,0 +1,35 @@
+import json
+
+import pytest
+
+from scanner_engine import PropGuardConfig, ScanEngine, load_score_weights
+
+WEIGHTS = {"trend": 0.4, "mom": 0.1, "vol": 0.1, "struct": 0.3, "liq": 0.1}
+
+def fit(tmp_path, **params):
+    doc = {"timeframe": PropGuardConfig.TIMEFRAME,
+           "params": dict({k: getattr(PropGuardConfig, k) for k in ("EMA_PERIOD", "ATR_MULTIPLIER")}, **params),
+           "live": {"weights": WEIGHTS, "trade_score": 80.0}}
+    path = tmp_path / "walkforward.json"
+    path.write_text(json.dumps(doc))
+    return str(path)
+
+def test_loads_matching_fit(tmp_path):
+    live = load_score_weights(fit(tmp_path), PropGuardConfig.TIMEFRAME)
+    assert live["weights"] == WEIGHTS and live["trade_score"] == 80.0
+
+def test_refuses_fit_under_other_settings(tmp_path):
+    with pytest.raises(ValueError, match="EMA_PERIOD"):
+        load_score_weights(fit(tmp_path, EMA_PERIOD=PropGuardConfig.EMA_PERIOD + 1))
+    with pytest.raises(ValueError, match="timeframe"):
+        load_score_weights(fit(tmp_path), "M1" if PropGuardConfig.TIMEFRAME != "M1" else "H1")
+
+def test_engine_keeps_weights_to_itself(tmp_path, monkeypatch):
+    configured = dict(PropGuardConfig.SCORE_WEIGHTS), PropGuardConfig.TRADE_SCORE
+    monkeypatch.setattr(PropGuardConfig, "SCORE_WEIGHTS_FILE", fit(tmp_path))
+    engine = ScanEngine(source=object())
+    assert engine.score_weights == WEIGHTS and engine.trade_score == 80.0
+    assert (PropGuardConfig.SCORE_WEIGHTS, PropGuardConfig.TRADE_SCORE) == configured
+    monkeypatch.setattr(PropGuardConfig, "SCORE_WEIGHTS_FILE", fit(tmp_path, ATR_MULTIPLIER=9.9))
+    refused = ScanEngine(source=object())
+    assert (refused.score_weights, refused.trade_score) == configured
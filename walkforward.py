@@ -0,0 +1,224 @@
+import sys
+import json
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from scanner_engine import PropGuardConfig, static_score, final_score
+from backtest import (OUTCOME_OPEN, OUTCOME_TP, INDICATOR_PARAMS, indicators_for, score_history, simulate_exits,
+                      trade_stats, history_from_args, add_history_args)
+
+# ==========================================
+# 1️⃣ SIGNAL TABLE
+# Indicators, component scores and exits are computed once over the whole history.
+# Bias, entry, SL and TP don't depend on the weights, so every fold and candidate
+# below is just a re-weighting of these columns.
+# ==========================================
+WEIGHT_KEYS = tuple(PropGuardConfig.SCORE_WEIGHTS)
+DEFAULT_THRESHOLDS = (60, 65, 70, 75, 80, 85, 90)
+
+def signal_table(hist, rr_ratio=2.0, horizon=100):
+    # One row per closed trade, sorted by bar time: time, exit time, components, outcome, R
+    ind = indicators_for(hist)
+    res = score_history(hist, ind, rr_ratio)
+    outcome, r_mult, held = simulate_exits(hist, res['bias'], res['entry'], res['sl'], res['tp'], horizon)
+    comps = np.stack([res[k] for k in WEIGHT_KEYS])
+    keep = hist.valid & (outcome != OUTCOME_OPEN) & np.isfinite(comps).all(axis=0)
+    rows, cols = np.nonzero(keep)
+    order = np.argsort(hist.time[rows, cols], kind="stable")
+    rows, cols = rows[order], cols[order]
+    return {"time": hist.time[rows, cols], "exit": hist.time[rows, cols + held[rows, cols]],
+            "comps": comps[:, rows, cols], "outcome": outcome[rows, cols], "r": r_mult[rows, cols]}
+
+def take(table, mask):
+    return {k: v[..., mask] for k, v in table.items()}
+
+def rescore(comps, weights):
+    # Same arithmetic as the live scanner; weights may hold (C, 1) columns to score C candidates at once
+    return final_score(static_score(comps[0], comps[1], comps[2], weights), comps[3], comps[4], weights)
+
+# ==========================================
+# 2️⃣ FIT
+# Every candidate weight vector is scored against every threshold in one pass: one
+# matrix product gives the unrounded scores, each is binned by the thresholds and
+# reverse cumulative sums give the trades, wins and total R at or above each one.
+# ==========================================
+def candidate_weights(n, seed=0):
+    # Row 0 is the configured weighting, the rest are uniform draws from the simplex
+    rng = np.random.default_rng(seed)
+    current = np.array([[PropGuardConfig.SCORE_WEIGHTS[k] for k in WEIGHT_KEYS]])
+    return np.vstack([current, rng.dirichlet(np.ones(len(WEIGHT_KEYS)), max(n - 1, 0))])
+
+def grid_stats(W, table, thresholds, chunk_cells=4_000_000):
+    # (trades, wins, total R) per candidate x threshold, each shaped (C, T)
+    C, T, n = len(W), len(thresholds), table["r"].shape[0]
+    trades, wins, total = np.zeros((C, T)), np.zeros((C, T)), np.zeros((C, T))
+    win = (table["outcome"] == OUTCOME_TP).astype(float)
+    # final_score rounds to 0.1, so round(x, 1) >= t is x >= (t rounded up to 0.1) - 0.05, ties aside
+    cuts = np.ceil(np.asarray(thresholds) * 10 - 1e-9) / 10 - 0.05
+    step = max(1, chunk_cells // max(n, 1))
+    for i in range(0, C, step):
+        w = W[i:i + step]
+        score = (100 * w) @ table["comps"]
+        bins = (np.searchsorted(cuts, score, side="right") + (T + 1) * np.arange(len(w))[:, None]).ravel()
+        for out, x in ((trades, None), (wins, win), (total, table["r"])):
+            x = None if x is None else np.broadcast_to(x, score.shape).ravel()
+            c = np.bincount(bins, x, minlength=len(w) * (T + 1)).reshape(len(w), T + 1)
+            out[i:i + len(w)] = np.cumsum(c[:, ::-1], axis=1)[:, ::-1][:, 1:]
+    return trades, wins, total
+
+def fit(W, table, thresholds, min_trades):
+    # Best (weights, threshold) by in-sample expectancy, or None when nothing trades enough
+    trades, wins, total = grid_stats(W, table, thresholds)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        exp = np.where(trades >= max(min_trades, 1), total / trades, -np.inf)
+    c, t = np.unravel_index(np.argmax(exp), exp.shape)
+    if not np.isfinite(exp[c, t]): return None
+    return dict(zip(WEIGHT_KEYS, W[c].tolist())), float(thresholds[t])
+
+def evaluate(table, weights, threshold):
+    return trade_stats(table["outcome"], table["r"], rescore(table["comps"], weights) >= threshold)
+
+# ==========================================
+# 3️⃣ WALK-FORWARD
+# Fit on `train` bars, apply to the next `test` bars, roll forward by `test`.
+# In-sample trades still open when the test window starts are purged, so no fit
+# sees an exit from the period it is evaluated on.
+# ==========================================
+def folds(times, train, test, anchored=False):
+    uniq = np.unique(times)
+    for start in range(train, len(uniq), test):
+        end = min(start + test, len(uniq)) - 1
+        yield int(uniq[0 if anchored else start - train]), int(uniq[start]), int(uniq[end])
+
+def pooled(stats):
+    n = sum(s["trades"] for s in stats)
+    if not n: return {"trades": 0, "hit_rate": None, "expectancy_r": None}
+    return {"trades": n, "hit_rate": sum(s["trades"] * s["hit_rate"] for s in stats if s["trades"]) / n,
+            "expectancy_r": sum(s["trades"] * s["expectancy_r"] for s in stats if s["trades"]) / n}
+
+def stability(schedule):
+    refit = [f for f in schedule if f["refit"]]
+    W = np.array([[f["weights"][k] for k in WEIGHT_KEYS] for f in schedule])
+    th = np.array([f["trade_score"] for f in schedule])
+    oos = [f["out_of_sample"]["expectancy_r"] for f in schedule if f["out_of_sample"]["trades"]]
+    ins = [f["in_sample"]["expectancy_r"] for f in refit]
+    oos_all = pooled([f["out_of_sample"] for f in schedule])
+    is_mean = float(np.mean(ins)) if ins else None
+    return {
+        "folds": len(schedule), "refit_folds": len(refit),
+        "weights": {k: {"mean": float(W[:, j].mean()), "std": float(W[:, j].std()), "min": float(W[:, j].min()),
+                        "max": float(W[:, j].max())} for j, k in enumerate(WEIGHT_KEYS)},
+        # share of the weight moved between consecutive folds (0 = unchanged, 1 = disjoint)
+        "turnover": float(np.abs(np.diff(W, axis=0)).sum(axis=1).mean() / 2) if len(W) > 1 else 0.0,
+        "trade_score": {"mean": float(th.mean()), "std": float(th.std()), "min": float(th.min()),
+                        "max": float(th.max())},
+        "in_sample_expectancy_r": is_mean,
+        "out_of_sample": oos_all,
+        "out_of_sample_fold_expectancy_r": {"mean": float(np.mean(oos)) if oos else None,
+                                            "std": float(np.std(oos)) if oos else None,
+                                            "positive_share": float(np.mean(np.array(oos) > 0)) if oos else None},
+        # pooled out-of-sample expectancy relative to what the fits promised
+        "efficiency": oos_all["expectancy_r"] / is_mean if oos_all["trades"] and is_mean and is_mean > 0 else None,
+        "baseline_out_of_sample": pooled([f["baseline"] for f in schedule]),
+    }
+
+def walk_forward(table, W, thresholds, train, test, anchored=False, min_trades=30):
+    cfg = PropGuardConfig
+    baseline = (dict(cfg.SCORE_WEIGHTS), float(cfg.TRADE_SCORE))
+    thresholds = np.asarray(sorted(thresholds), dtype=float)
+    t, ex = table["time"], table["exit"]
+    schedule, current = [], baseline
+    for fit_from, apply_from, apply_to in folds(t, train, test, anchored):
+        ins = take(table, (t >= fit_from) & (ex < apply_from))
+        oos = take(table, (t >= apply_from) & (t <= apply_to))
+        best = fit(W, ins, thresholds, min_trades)
+        current = best or current   # nothing tradeable in-sample: keep the previous fit
+        weights, threshold = current
+        schedule.append({"fit_from": fit_from, "apply_from": apply_from, "apply_to": apply_to,
+                         "refit": best is not None, "weights": weights, "trade_score": threshold,
+                         "in_sample": evaluate(ins, weights, threshold),
+                         "out_of_sample": evaluate(oos, weights, threshold),
+                         "baseline": evaluate(oos, *baseline)})
+    # The weights to trade from here on: one more fit on the latest window
+    uniq = np.unique(t)
+    live_from = int(uniq[0 if anchored or len(uniq) <= train else -train]) if len(uniq) else 0
+    recent = take(table, t >= live_from)
+    best = fit(W, recent, thresholds, min_trades) or current
+    live = {"fit_from": live_from, "fit_to": int(uniq[-1]) if len(uniq) else 0, "refit": best is not current,
+            "weights": best[0], "trade_score": best[1], "in_sample": evaluate(recent, *best)}
+    return schedule, live
+
+# ==========================================
+# 4️⃣ CLI
+# ==========================================
+def fmt_time(ts):
+    return datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%d %H:%M")
+
+def fmt_stats(s):
+    return f"{s['trades']:>7}{s['expectancy_r']:>+8.3f}" if s["trades"] else f"{s['trades']:>7}{'-':>8}"
+
+def print_schedule(schedule, live, stats):
+    print(f"{'Applies from':<18}" + "".join(f"{k[:6]:>7}" for k in WEIGHT_KEYS) +
+          f"{'Score':>7}{'IS n':>7}{'IS E[R]':>8}{'OOS n':>7}{'OOS E':>8}{'Base n':>7}{'Base E':>8}")
+    for f in schedule + [dict(live, apply_from=live["fit_to"], out_of_sample=None, baseline=None)]:
+        row = f"{fmt_time(f['apply_from']):<18}" + "".join(f"{f['weights'][k]:>7.3f}" for k in WEIGHT_KEYS)
+        row += f"{f['trade_score']:>7g}{fmt_stats(f['in_sample'])}"
+        row += (fmt_stats(f["out_of_sample"]) + fmt_stats(f["baseline"])) if f["out_of_sample"] else "   (live)"
+        print(row + ("" if f["refit"] else "  *"))
+    o, b = stats["out_of_sample"], stats["baseline_out_of_sample"]
+    print(f"\nOut of sample: {o['trades']} trades, "
+          + (f"hit {100 * o['hit_rate']:.1f}%, E[R] {o['expectancy_r']:+.3f}" if o["trades"] else "no trades")
+          + f" | configured weights: {b['trades']} trades, "
+          + (f"hit {100 * b['hit_rate']:.1f}%, E[R] {b['expectancy_r']:+.3f}" if b["trades"] else "no trades"))
+    eff = stats["efficiency"]
+    print(f"Weight turnover per fold {100 * stats['turnover']:.0f}%, TRADE score "
+          f"{stats['trade_score']['mean']:.1f} ± {stats['trade_score']['std']:.1f}, "
+          f"walk-forward efficiency {'-' if eff is None else f'{eff:.2f}'}  (* = not refit, previous weights kept)")
+
+def main(argv=None):
+    import argparse
+    cfg = PropGuardConfig
+    p = argparse.ArgumentParser(description="Walk-forward fit of the score weights and TRADE threshold.")
+    add_history_args(p)
+    p.add_argument("--rr", type=float, default=2.0, help="reward to risk ratio")
+    p.add_argument("--horizon", type=int, default=100, help="bars before an open trade is closed at market")
+    p.add_argument("--train", type=int, default=4000, help="in-sample window, in bars")
+    p.add_argument("--test", type=int, default=1000, help="out-of-sample window (and roll step), in bars")
+    p.add_argument("--anchored", action="store_true", help="grow the in-sample window from the first bar")
+    p.add_argument("--candidates", type=int, default=300, help="weight vectors tried per fold")
+    p.add_argument("--thresholds", default=",".join(map(str, DEFAULT_THRESHOLDS)), help="TRADE scores tried")
+    p.add_argument("--min-trades", type=int, default=30, help="in-sample trades a fit needs")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--out", default="walkforward.json", help="schedule for SCORE_WEIGHTS_FILE / --weights")
+    args = p.parse_args(argv)
+
+    hist = history_from_args(args)
+    if not hist.symbols:
+        print("No history loaded", file=sys.stderr)
+        return 1
+    t0 = time.perf_counter()
+    table = signal_table(hist, args.rr, args.horizon)
+    t1 = time.perf_counter()
+    W = candidate_weights(args.candidates, args.seed)
+    thresholds = [float(x) for x in args.thresholds.split(",")]
+    schedule, live = walk_forward(table, W, thresholds, args.train, args.test, args.anchored, args.min_trades)
+    t2 = time.perf_counter()
+    if not schedule:
+        print(f"History too short: need more than --train {args.train} bars", file=sys.stderr)
+        return 1
+    stats = stability(schedule)
+    print(f"{len(hist.symbols)} symbols, {len(table['r'])} closed trades ({args.timeframe}), {len(schedule)} folds "
+          f"x {len(W)} weightings x {len(thresholds)} thresholds | signals {t1 - t0:.1f}s, fits {t2 - t1:.1f}s\n")
+    print_schedule(schedule, live, stats)
+    with open(args.out, "w") as f:
+        json.dump({"symbols": hist.symbols, "timeframe": hist.timeframe, "rr": args.rr, "horizon": args.horizon,
+                   "train": args.train, "test": args.test, "anchored": args.anchored,
+                   "params": {k: getattr(cfg, k) for k in INDICATOR_PARAMS + ("ATR_MULTIPLIER",)},
+                   "live": live, "schedule": schedule, "stability": stats}, f, indent=1)
+    print(f"Schedule written to {args.out} (load it with SCORE_WEIGHTS_FILE or scanner_engine.py --weights)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())